@@ -46,6 +46,11 @@ class ParallelSummaryExecutor:
         )
         self.min_batch_size = min_batch_size
 
+        # Levels computed by the last generate_all_summaries_parallel run, kept
+        # so callers can analyze them without recomputing the traversal order
+        self.last_definition_levels: list[list[set[int]]] = []
+        self.last_file_levels: list[list[set[int]]] = []
+
     def compute_batched_traversal_order(self, graph: IdGraph) -> list[list[set[int]]]:
         """Compute traversal order for definitions that enables parallelization.
 
@@ -71,12 +76,10 @@ class ParallelSummaryExecutor:
 
         condensed: IdGraph = nx.condensation(graph, sccs)
 
-        node_map: dict[int, set[int]] = {i: scc for i, scc in enumerate(sccs)}
-
-        reduced_graph: IdGraph = nx.transitive_reduction(condensed)
-
-        for gen in nx.topological_generations(reduced_graph):
-            curr: list[set[int]] = [node_map[i] for i in gen]
+        # Generations follow the longest path from the sources, which transitive
+        # edges never change, so the condensation is walked as is
+        for gen in nx.topological_generations(condensed):
+            curr: list[set[int]] = [sccs[i] for i in gen]
             generations.append(curr)
 
         return generations
@@ -257,6 +260,63 @@ class ParallelSummaryExecutor:
                 print(f"  ⏳ Waiting {delay_between_batches:.1f}s before next batch...")
                 await asyncio.sleep(delay_between_batches)
 
+    async def process_graph(
+        self,
+        graph: IdGraph,
+        process_function: Callable[[set[int], Session], Coroutine[None, None, None]],
+        session: Session,
+    ) -> None:
+        """Process every node of a dependency graph as soon as it becomes ready.
+
+        Nodes are grouped into strongly connected components, and a component
+        starts the moment its last dependency finishes rather than when its whole
+        topological level has, so one slow summary does not idle the others.
+        Concurrency is bounded by max_concurrent, and finished work is committed
+        every min_batch_size components.
+        """
+        # Reverse so that edges point from a dependency to its dependents
+        reversed_graph: IdGraph = graph.reverse(copy=False)
+        sccs: list[set[int]] = list(nx.strongly_connected_components(reversed_graph))
+        if not sccs:
+            return
+
+        condensed: IdGraph = nx.condensation(reversed_graph, sccs)
+        pending_deps: dict[int, int] = dict(condensed.in_degree())
+
+        print(f"🔧 Processing {len(sccs)} summaries as their dependencies complete")
+
+        sem = asyncio.Semaphore(self.max_concurrent)
+        completed = 0
+
+        async def run_one(node: int, tg: asyncio.TaskGroup) -> None:
+            nonlocal completed
+            async with sem:
+                await asyncio.wait_for(
+                    process_function(sccs[node], session), timeout=600
+                )
+
+            completed += 1
+            if completed % self.min_batch_size == 0:
+                session.commit()
+
+            # Start every dependent whose last dependency this was
+            for dependent in condensed.successors(node):
+                pending_deps[dependent] -= 1
+                if pending_deps[dependent] == 0:
+                    _ = tg.create_task(run_one(dependent, tg))
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for node, num_deps in pending_deps.items():
+                    if num_deps == 0:
+                        _ = tg.create_task(run_one(node, tg))
+        except ExceptionGroup as eg:
+            # Keep the summaries that did finish, like a failed batch used to
+            session.commit()
+            raise ValueError(f"Error processing summaries: {eg.exceptions}") from eg
+
+        session.commit()
+
     async def generate_all_summaries_parallel(
         self, definition_graph: IdGraph, file_graph: IdGraph
     ) -> dict[str, Any]:
@@ -272,36 +332,29 @@ class ParallelSummaryExecutor:
 
         # Compute definition traversal levels
         definition_levels = self.compute_batched_traversal_order(definition_graph)
+        self.last_definition_levels = definition_levels
         print(
             f"Computed {len(definition_levels)} definition levels for parallel processing"
         )
 
-        # Process definitions level by level
+        # Process each definition as soon as its dependencies are summarized
         definition_start_time = asyncio.get_event_loop().time()
-        for i, level in enumerate(definition_levels):
-            print(
-                f"📊 Processing definition level {i + 1}/{len(definition_levels)} ({len(level)} definitions)"
+        with session_scope(self.db_manager) as session:
+            await self.process_graph(
+                definition_graph, self.generate_definition_summary_async, session
             )
-            with session_scope(self.db_manager) as session:
-                # Process each level of definitions in parallel
-                await self.process_level(
-                    level, self.generate_definition_summary_async, session
-                )
         definition_end_time = asyncio.get_event_loop().time()
         # Compute file traversal levels
         file_levels = self.compute_batched_traversal_order(file_graph)
+        self.last_file_levels = file_levels
         print(f"Computed {len(file_levels)} file levels for parallel processing")
 
-        # Process files level by level
+        # Process each file as soon as the files it depends on are summarized
         file_start_time = asyncio.get_event_loop().time()
-        for i, level in enumerate(file_levels):
-            print(
-                f"📊 Processing file level {i + 1}/{len(file_levels)} ({len(level)} files)"
+        with session_scope(self.db_manager) as session:
+            await self.process_graph(
+                file_graph, self.generate_file_summary_async, session
             )
-            with session_scope(self.db_manager) as session:
-                await self.process_level(
-                    level, self.generate_file_summary_async, session
-                )
         file_end_time = asyncio.get_event_loop().time()
 
         # Return statistics
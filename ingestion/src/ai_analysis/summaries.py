@@ -71,19 +71,19 @@ def _estimate_summary_tokens(entity_type: str) -> int:
         return 60  # Default to definition-like summary
 
 
-def _calculate_file_input_tokens(file: FileModel, num_definitions: int) -> int:
-    """Calculate estimated tokens for file summary input.
+def _file_input_tokens(file_content: str | None, num_definitions: int) -> int:
+    """Estimate file summary input tokens from the raw column values.
 
     File summary input = file content + summaries of all definitions in the file
 
     Args:
-        file: FileModel instance
+        file_content: Content of the file, if any
         num_definitions: Number of definitions in the file
 
     Returns:
         Estimated number of input tokens
     """
-    file_content_tokens = _estimate_tokens(file.file_content or "")
+    file_content_tokens = _estimate_tokens(file_content or "")
     definition_summaries_tokens = num_definitions * _estimate_summary_tokens(
         "definition"
     )
@@ -91,21 +91,19 @@ def _calculate_file_input_tokens(file: FileModel, num_definitions: int) -> int:
     return file_content_tokens + definition_summaries_tokens
 
 
-def _calculate_definition_input_tokens(
-    definition: DefinitionModel, num_dependencies: int
-) -> int:
-    """Calculate estimated tokens for definition summary input.
+def _definition_input_tokens(source_code: str | None, num_dependencies: int) -> int:
+    """Estimate definition summary input tokens from the raw column values.
 
     Definition summary input = definition source code + summaries of direct dependencies
 
     Args:
-        definition: DefinitionModel instance
+        source_code: Source code of the definition, if any
         num_dependencies: Number of direct dependencies (function calls + type references)
 
     Returns:
         Estimated number of input tokens
     """
-    source_code_tokens = _estimate_tokens(definition.source_code or "")
+    source_code_tokens = _estimate_tokens(source_code or "")
     dependency_summaries_tokens = num_dependencies * _estimate_summary_tokens(
         "definition"
     )
@@ -113,6 +111,34 @@ def _calculate_definition_input_tokens(
     return source_code_tokens + dependency_summaries_tokens
 
 
+def _calculate_file_input_tokens(file: FileModel, num_definitions: int) -> int:
+    """Calculate estimated tokens for file summary input.
+
+    Args:
+        file: FileModel instance
+        num_definitions: Number of definitions in the file
+
+    Returns:
+        Estimated number of input tokens
+    """
+    return _file_input_tokens(file.file_content, num_definitions)
+
+
+def _calculate_definition_input_tokens(
+    definition: DefinitionModel, num_dependencies: int
+) -> int:
+    """Calculate estimated tokens for definition summary input.
+
+    Args:
+        definition: DefinitionModel instance
+        num_dependencies: Number of direct dependencies (function calls + type references)
+
+    Returns:
+        Estimated number of input tokens
+    """
+    return _definition_input_tokens(definition.source_code, num_dependencies)
+
+
 # In-memory cache for single analysis run
 file_summary_cache: dict[int, str] = {}
 definition_summary_cache: dict[int, str] = {}
@@ -126,11 +152,17 @@ summaries_generated: int = 0
 
 
 def parse_llm_response(response: str) -> tuple[str, str]:
-    """Parse the LLM response to extract the short and full summaries."""
+    """Parse the LLM response to extract the short and full summaries.
+
+    Raises:
+        IndexError: If the response is missing the opening or closing gist tag
+    """
 
     # short summary is between the <gist> </gist> tags
-    short_summary = response.split("<gist>")[1].split("</gist>")[0]
-    full_summary = response.split("</gist>")[1]
+    _, open_tag, rest = response.partition("<gist>")
+    short_summary, close_tag, full_summary = rest.partition("</gist>")
+    if not open_tag or not close_tag:
+        raise IndexError("LLM response is missing <gist>...</gist> tags")
 
     return short_summary, full_summary
 
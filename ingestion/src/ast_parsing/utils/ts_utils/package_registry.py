@@ -27,6 +27,7 @@ class MonorepoSetupInfo:
     packages_referenced: list[str] = field(
         default_factory=list
     )  # List of package names/paths referenced
+    tsconfig: dict[str, Any] | None = None  # Root tsconfig.json as written, if any
 
 
 @dataclass
@@ -323,7 +324,7 @@ class PackageRegistry:
             cross_package_dependencies.update(local_deps)
 
         if cross_package_dependencies:
-            self._setup_package_based_monorepo(packages)
+            tsconfig = self._setup_package_based_monorepo(packages)
             return MonorepoSetupInfo(
                 type="package_based_monorepo",
                 synthetic_tsconfig_created=True,
@@ -331,23 +332,27 @@ class PackageRegistry:
                 packages_referenced=[
                     pkg.name or os.path.basename(pkg.path) for pkg in packages
                 ],
+                tsconfig=tsconfig,
             )
 
         # Scenario 3: Direct import monorepo
         # Check if packages might be importing directly from each other
         if len(packages) > 1:
-            self._setup_direct_import_monorepo(packages)
+            tsconfig = self._setup_direct_import_monorepo(packages)
             return MonorepoSetupInfo(
                 type="direct_import_monorepo",
                 tsconfig_extended=True,
                 packages_referenced=[
                     pkg.name or os.path.basename(pkg.path) for pkg in packages
                 ],
+                tsconfig=tsconfig,
             )
 
         return MonorepoSetupInfo(type="unknown")
 
-    def _setup_package_based_monorepo(self, packages: list[PackageInfo]):
+    def _setup_package_based_monorepo(
+        self, packages: list[PackageInfo]
+    ) -> dict[str, Any]:
         """Create synthetic tsconfig and symlinks for package-based monorepo."""
         repo_root = Path(self.repo_path)
 
@@ -359,7 +364,7 @@ class PackageRegistry:
             relative_path = pkg_path.relative_to(repo_root)
             synthetic_tsconfig["references"].append({"path": str(relative_path)})
 
-        self.update_tsconfig_with_references(
+        tsconfig = self.update_tsconfig_with_references(
             repo_root / "tsconfig.json", synthetic_tsconfig["references"]
         )
 
@@ -376,7 +381,11 @@ class PackageRegistry:
                     pkg_path = Path(pkg.path)
                     symlink_path.symlink_to(pkg_path, target_is_directory=True)
 
-    def _setup_direct_import_monorepo(self, packages: list[PackageInfo]):
+        return tsconfig
+
+    def _setup_direct_import_monorepo(
+        self, packages: list[PackageInfo]
+    ) -> dict[str, Any]:
         """Extend existing tsconfig or create new one with package references."""
         repo_root = Path(self.repo_path)
         tsconfig_path = repo_root / "tsconfig.json"
@@ -388,12 +397,16 @@ class PackageRegistry:
             relative_path = pkg_path.relative_to(repo_root)
             references.append({"path": str(relative_path)})
 
-        self.update_tsconfig_with_references(tsconfig_path, references)
+        return self.update_tsconfig_with_references(tsconfig_path, references)
 
     def update_tsconfig_with_references(
         self, tsconfig_path: Path, references: list[dict[str, str]]
-    ):
-        """Update existing tsconfig.json to include package references."""
+    ) -> dict[str, Any]:
+        """Update existing tsconfig.json to include package references.
+
+        Returns:
+            The config written to tsconfig_path, so callers need not read it back
+        """
         if tsconfig_path.exists():
             # Extend existing tsconfig
             try:
@@ -413,18 +426,24 @@ class PackageRegistry:
                 with open(tsconfig_path, "w", encoding="utf-8") as f:
                     json.dump(existing_config, f, indent=2)
 
+                return existing_config
+
             except (json.JSONDecodeError, OSError):
                 # If we can't parse existing config, create new one
-                self._create_new_tsconfig_with_references(tsconfig_path, references)
+                return self._create_new_tsconfig_with_references(
+                    tsconfig_path, references
+                )
         else:
             # Create new tsconfig
-            self._create_new_tsconfig_with_references(tsconfig_path, references)
+            return self._create_new_tsconfig_with_references(tsconfig_path, references)
 
     def _create_new_tsconfig_with_references(
         self, tsconfig_path: Path, references: list[dict[str, str]]
-    ):
+    ) -> dict[str, Any]:
         """Create a new tsconfig.json with the given references."""
         new_config = {"files": [], "references": references}
 
         with open(tsconfig_path, "w", encoding="utf-8") as f:
             json.dump(new_config, f, indent=2)
+
+        return new_config
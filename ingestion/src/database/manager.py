@@ -88,6 +88,23 @@ def has_session_context() -> bool:
     return _session_context.get() is not None
 
 
+# Schema objects created outside SQLAlchemy metadata by create_fts_indexes()
+# and create_vector_indexes()
+_RAW_SCHEMA_OBJECTS = frozenset(
+    {
+        "definitions_name_fts",
+        "definitions_ai",
+        "definitions_au",
+        "definitions_ad",
+        "files_path_fts",
+        "files_ai",
+        "files_au",
+        "files_ad",
+        "embeddings_vec",
+    }
+)
+
+
 class DatabaseManager:
     """Manages SQLite/Turso database connections and schema."""
 
@@ -174,11 +191,38 @@ class DatabaseManager:
             expire_on_commit=self._expire_on_commit,
         )
 
+        if self._schema_is_current():
+            return
+
         self.create_tables()
         self.create_fts_indexes()
         # Create sqlite-vec virtual table for vector search (1536 dims default)
         self.create_vector_indexes()
 
+    def _schema_is_current(self) -> bool:
+        """Check whether every table, index, trigger and virtual table already exists.
+
+        Lets managers opened against an existing database file skip the
+        per-table existence checks issued by create_all() and the FTS/vector DDL.
+        A fresh in-memory database never has a schema, so it is not queried.
+
+        Returns:
+            True if no schema objects are missing, False otherwise
+        """
+        if self.db_path == ":memory:":
+            return False
+
+        expected = set(_RAW_SCHEMA_OBJECTS)
+        for table in Base.metadata.tables.values():
+            expected.add(table.name)
+            expected.update(str(index.name) for index in table.indexes)
+
+        with self.engine.connect() as connection:
+            existing = set(
+                connection.exec_driver_sql("SELECT name FROM sqlite_master").scalars()
+            )
+        return expected <= existing
+
     def create_tables(self) -> None:
         """Create all database tables."""
         Base.metadata.create_all(bind=self.engine)
@@ -27,7 +27,7 @@ from typing import Any
 from array import array
 
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import text
+from sqlalchemy import and_, text
 from sqlalchemy.dialects.sqlite import insert
 from tenacity import (
     retry,
@@ -80,6 +80,15 @@ class EmbeddingsGenerator:
             .filter(FileModel.ai_summary.isnot(None))
             .filter(FileModel.ai_summary != "")
         )
+        if self.skip_existing:
+            # Anti-join against existing embeddings so re-runs only embed new rows
+            q = q.outerjoin(
+                EmbeddingModel,
+                and_(
+                    EmbeddingModel.entity_type == "file",
+                    EmbeddingModel.entity_id == FileModel.id,
+                ),
+            ).filter(EmbeddingModel.id.is_(None))
 
         files = q.all()
         logger.info(
@@ -125,6 +134,14 @@ class EmbeddingsGenerator:
             .filter(DefinitionModel.ai_summary.isnot(None))
             .filter(DefinitionModel.ai_summary != "")
         )
+        if self.skip_existing:
+            q = q.outerjoin(
+                EmbeddingModel,
+                and_(
+                    EmbeddingModel.entity_type == "definition",
+                    EmbeddingModel.entity_id == DefinitionModel.id,
+                ),
+            ).filter(EmbeddingModel.id.is_(None))
 
         defs = q.all()
         logger.info(
@@ -62,7 +62,6 @@ class EmbeddingsClient:
             return []
 
         try:
-            print("generating embeddings trial")
             logger.debug(f"Generating embeddings for {len(texts)} texts")
 
             response = self.client.embeddings.create(
@@ -74,7 +73,6 @@ class EmbeddingsClient:
             embeddings = [embedding.embedding for embedding in response.data]
 
             logger.debug(f"Successfully generated {len(embeddings)} embeddings")
-            print(f"generated {len(embeddings)} embeddings")
             return embeddings
 
         except Exception as e:
@@ -1,43 +1,36 @@
 """Shared pytest fixtures for testing."""
 
+import asyncio
+from datetime import datetime, timezone
+from typing import Any
+
 import pytest
+from sqlalchemy import Connection, event, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
-from database.manager import DatabaseManager, session_scope
+from ai_analysis.summaries import clear_summary_caches as _clear_summary_caches
+from dag_builder.netx import DAGBuilder
+from database.manager import DatabaseManager
 from database.models import (
+    Base,
     FileModel,
     DefinitionModel,
     ImportModel,
     ReferenceModel,
 )
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not built for Windows
+    uvloop = None
 
-@pytest.fixture
-def db_manager():
-    """Create an in-memory database manager for testing."""
-    return DatabaseManager(db_path=":memory:", echo=False, expire_on_commit=False)
-
-
-@pytest.fixture
-def sample_file(db_manager):
-    """Create a sample FileModel for testing."""
-    with session_scope(db_manager) as session:
-        file_model = FileModel(
-            file_path="test/calculator.ts",
-            file_content="""
-import { MathUtils } from './utils';
-
-export function add(a: number, b: number): number {
-    return a + b;
-}
-
-export function multiply(x: number, y: number): number {
-    return MathUtils.multiply(x, y);
-}
 
-export class Calculator {
-    private history: number[] = [];
-    
-    calculate(operation: string, a: number, b: number): number {
+# TypeScript sources shared by the fixtures below. Definition snippets are
+# spliced into their file contents so each block is written exactly once.
+_ADD_SRC = "export function add(a: number, b: number): number {\n    return a + b;\n}"
+_MULTIPLY_SRC = "export function multiply(x: number, y: number): number {\n    return MathUtils.multiply(x, y);\n}"
+_CALCULATE_METHOD_SRC = """calculate(operation: string, a: number, b: number): number {
         let result: number;
         switch (operation) {
             case 'add':
@@ -51,294 +44,400 @@ export class Calculator {
         }
         this.history.push(result);
         return result;
+    }"""
+_CALCULATOR_CLASS_SRC = f"""export class Calculator {{
+    private history: number[] = [];
+    
+    {_CALCULATE_METHOD_SRC}
+}}"""
+_CALCULATOR_TS_SRC = f"""
+import {{ MathUtils }} from './utils';
+
+{_ADD_SRC}
+
+{_MULTIPLY_SRC}
+
+{_CALCULATOR_CLASS_SRC}
+"""
+
+_MATH_UTILS_MULTIPLY_SRC = "static multiply(x: number, y: number): number {\n        return x * y;\n    }"
+_MATH_UTILS_CLASS_SRC = f"""export class MathUtils {{
+    {_MATH_UTILS_MULTIPLY_SRC}
+    
+    static divide(x: number, y: number): number {{
+        if (y === 0) throw new Error('Division by zero');
+        return x / y;
+    }}
+}}"""
+_UTILS_TS_SRC = f"\n{_MATH_UTILS_CLASS_SRC}\n"
+
+_BASE_UTILS_TS_SRC = """
+export class UtilsA {
+    static process(data: string): string {
+        return data.toUpperCase();
     }
 }
-""",
-            language="typescript",
-        )
 
-        session.add(file_model)
-        session.flush()
-        return file_model
+export class UtilsB {
+    static transform(value: number): number {
+        return value * 2;
+    }
+}
+"""
+_MID_LAYER_TS_SRC = """
+import { UtilsA, UtilsB } from './base_utils';
+
+export class ServiceA {
+    processText(text: string): string {
+        return UtilsA.process(text);
+    }
+}
+
+export class ServiceB {
+    processNumber(num: number): number {
+        return UtilsB.transform(num);
+    }
+}
+"""
+_MAIN_APP_SRC = """export class MainApp {
+    process(text: string, num: number): {text: string, num: number} {
+        const processedText = ServiceA.processText(text);
+        const processedNum = ServiceB.processNumber(num);
+        return { text: processedText, num: processedNum };
+    }
+}"""
+_TOP_LAYER_TS_SRC = f"""
+import {{ ServiceA, ServiceB }} from './mid_layer';
+
+{_MAIN_APP_SRC}
+"""
+
+
+def _bulk_insert[M: Base](
+    session: Session, model: type[M], rows: list[dict[str, Any]]
+) -> list[M]:
+    """Insert ``rows`` with a single INSERT ... RETURNING and return the ORM objects.
+
+    Bypasses per-object unit-of-work bookkeeping; rows come back in the same
+    order as ``rows`` so callers can unpack them positionally.
+    """
+    stmt = insert(model).returning(model, sort_by_parameter_order=True)
+    return list(session.scalars(stmt, rows))
+
+
+def _file_row(file_path: str, file_content: str) -> dict[str, Any]:
+    """Build a `files` row, populating the NOT NULL timestamp columns."""
+    now = datetime.now(timezone.utc)
+    return {
+        "file_path": file_path,
+        "file_content": file_content,
+        "language": "typescript",
+        "last_modified": now,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _definition_row(file_id: int, **values: Any) -> dict[str, Any]:
+    """Build a `definitions` row for ``file_id``."""
+    return {
+        "file_id": file_id,
+        "created_at": datetime.now(timezone.utc),
+        "docstring": None,
+        **values,
+    }
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run every async test and fixture on uvloop where it is available.
+
+    All tests share one session event loop, so the policy is set here rather
+    than in a package conftest, where it would depend on which test ran first.
+    """
+    if uvloop is None:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
+def db_manager():
+    """Create an in-memory database manager; schema DDL runs once per session."""
+    manager = DatabaseManager(db_path=":memory:", echo=False, expire_on_commit=False)
+    # Every connection must reach the same in-memory database, otherwise the
+    # schema created above would be invisible to the fixtures' connection.
+    assert isinstance(manager.engine.pool, StaticPool)
+    yield manager
+    manager.close()
+
+
+@pytest.fixture(scope="module")
+def db_connection(db_manager: DatabaseManager):
+    """Bind the manager to one connection wrapped in a module-long transaction.
+
+    Sessions opened through the manager join this transaction via SAVEPOINTs,
+    so their commits stay visible to later fixtures but are discarded at
+    module teardown, leaving the session-wide schema empty for the next module.
+    """
+    connection = db_manager.engine.connect()
+    # pysqlite defers BEGIN and ignores SAVEPOINT; take over transaction control
+    driver_connection = connection.connection.driver_connection
+    isolation_level = driver_connection.isolation_level  # pyright: ignore[reportOptionalMemberAccess]
+    driver_connection.isolation_level = None  # pyright: ignore[reportOptionalMemberAccess]
+
+    @event.listens_for(connection, "begin")
+    def _emit_begin(conn: Connection) -> None:
+        _ = conn.exec_driver_sql("BEGIN")
+
+    transaction = connection.begin()
+    db_manager.SessionLocal.configure(
+        bind=connection, join_transaction_mode="create_savepoint"
+    )
+    yield connection
+    db_manager.SessionLocal.configure(bind=db_manager.engine)
+    transaction.rollback()
+    connection.close()
+    # The StaticPool hands this DBAPI connection to every later session, so
+    # give pysqlite its transaction control back once the module is done
+    driver_connection.isolation_level = isolation_level  # pyright: ignore[reportOptionalMemberAccess]
+
+
+@pytest.fixture(autouse=True)
+def rollback_test_writes(request: pytest.FixtureRequest):
+    """Roll back each test's writes so module-scoped data stays pristine."""
+    if "db_connection" not in request.fixturenames:
+        yield
+        return
+
+    connection: Connection = request.getfixturevalue("db_connection")
+    savepoint = connection.begin_nested()
+    yield
+    if savepoint.is_active:
+        savepoint.rollback()
 
 
 @pytest.fixture
-def sample_definitions(db_manager, sample_file: FileModel):
-    """Create sample DefinitionModel instances for testing."""
-    with session_scope(db_manager) as session:
-        definitions = []
+def session(db_connection: Connection):
+    """Provide an ORM session whose writes are rolled back after the test."""
+    with Session(
+        bind=db_connection,
+        join_transaction_mode="create_savepoint",
+        autoflush=False,
+        expire_on_commit=False,
+    ) as session:
+        yield session
+
+
+@pytest.fixture(scope="module")
+def module_session(db_connection: Connection):
+    """Provide one session shared by the module-scoped data fixtures.
+
+    Its SAVEPOINT stays open for the whole module, so the rows it inserts are
+    visible to every session on the connection and vanish at module teardown.
+    """
+    with Session(
+        bind=db_connection,
+        join_transaction_mode="create_savepoint",
+        autoflush=False,
+        expire_on_commit=False,
+    ) as session:
+        yield session
+
 
+@pytest.fixture(scope="module")
+def sample_file(module_session: Session):
+    """Create a sample FileModel for testing."""
+    (file_model,) = _bulk_insert(
+        module_session,
+        FileModel,
+        [_file_row("test/calculator.ts", _CALCULATOR_TS_SRC)],
+    )
+    return file_model
+
+
+@pytest.fixture(scope="module")
+def sample_definitions(module_session: Session, sample_file: FileModel):
+    """Create sample DefinitionModel instances for testing."""
+    rows = [
         # Add function definition
-        add_func = DefinitionModel(
+        _definition_row(
+            sample_file.id,
             name="add",
             definition_type="function",
             start_line=4,
             end_line=6,
-            source_code="export function add(a: number, b: number): number {\n    return a + b;\n}",
+            source_code=_ADD_SRC,
             is_exported=True,
             complexity_score=1,
-            docstring=None,
             source_code_hash="add_hash",
-        )
-        add_func.file = sample_file
-
+        ),
         # Multiply function definition
-        multiply_func = DefinitionModel(
+        _definition_row(
+            sample_file.id,
             name="multiply",
             definition_type="function",
             start_line=8,
             end_line=10,
-            source_code="export function multiply(x: number, y: number): number {\n    return MathUtils.multiply(x, y);\n}",
+            source_code=_MULTIPLY_SRC,
             is_exported=True,
             complexity_score=2,
-            docstring=None,
             source_code_hash="multiply_hash",
-        )
-        multiply_func.file = sample_file
-
+        ),
         # Calculator class definition
-        calculator_class = DefinitionModel(
+        _definition_row(
+            sample_file.id,
             name="Calculator",
             definition_type="class",
             start_line=12,
             end_line=28,
-            source_code="""export class Calculator {
-    private history: number[] = [];
-    
-    calculate(operation: string, a: number, b: number): number {
-        let result: number;
-        switch (operation) {
-            case 'add':
-                result = add(a, b);
-                break;
-            case 'multiply':
-                result = multiply(a, b);
-                break;
-            default:
-                throw new Error('Unknown operation');
-        }
-        this.history.push(result);
-        return result;
-    }
-}""",
+            source_code=_CALCULATOR_CLASS_SRC,
             is_exported=True,
             complexity_score=5,
             docstring="A calculator class that performs basic arithmetic operations and maintains history.",
             source_code_hash="calculator_hash",
-        )
-        calculator_class.file = sample_file
-
+        ),
         # Calculate method definition (nested in class)
-        calculate_method = DefinitionModel(
+        _definition_row(
+            sample_file.id,
             name="calculate",
             definition_type="function",
             start_line=15,
             end_line=27,
-            source_code="""calculate(operation: string, a: number, b: number): number {
-        let result: number;
-        switch (operation) {
-            case 'add':
-                result = add(a, b);
-                break;
-            case 'multiply':
-                result = multiply(a, b);
-                break;
-            default:
-                throw new Error('Unknown operation');
-        }
-        this.history.push(result);
-        return result;
-    }""",
+            source_code=_CALCULATE_METHOD_SRC,
             is_exported=False,
             complexity_score=4,
-            docstring=None,
             source_code_hash="calculate_hash",
-        )
-        calculate_method.file = sample_file
-
-        definitions = [add_func, multiply_func, calculator_class, calculate_method]
-
-        for definition in definitions:
-            session.add(definition)
+        ),
+    ]
 
-        session.flush()
-        return definitions
+    return _bulk_insert(module_session, DefinitionModel, rows)
 
 
 @pytest.fixture
-def sample_function_calls(db_manager, sample_definitions):
+def sample_function_calls(session: Session, sample_definitions):
     """Create sample FunctionCallModel instances for testing."""
-    with session_scope(db_manager) as session:
-        add_func, multiply_func, calculator_class, calculate_method = sample_definitions
-
-        function_calls = []
+    add_func, multiply_func, calculator_class, calculate_method = sample_definitions
 
+    rows = [
         # calculate method calls add function
-        call_add = ReferenceModel(
-            reference_name="add",
-            reference_type="local",
-            source_definition=calculate_method,
-        )
-        call_add.target_definition = add_func
-
+        {
+            "reference_name": "add",
+            "reference_type": "local",
+            "source_definition_id": calculate_method.id,
+            "target_definition_id": add_func.id,
+        },
         # calculate method calls multiply function
-        call_multiply = ReferenceModel(
-            reference_name="multiply",
-            reference_type="local",
-            source_definition=calculate_method,
-        )
-        call_multiply.target_definition = multiply_func
-
+        {
+            "reference_name": "multiply",
+            "reference_type": "local",
+            "source_definition_id": calculate_method.id,
+            "target_definition_id": multiply_func.id,
+        },
         # multiply function calls external MathUtils.multiply
-        call_math_utils = ReferenceModel(
-            reference_name="MathUtils.multiply",
-            reference_type="imported",
-            source_definition=multiply_func,
-        )
-
-        function_calls = [call_add, call_multiply, call_math_utils]
+        {
+            "reference_name": "MathUtils.multiply",
+            "reference_type": "imported",
+            "source_definition_id": multiply_func.id,
+            "target_definition_id": None,
+        },
+    ]
 
-        for call in function_calls:
-            session.add(call)
-
-        session.flush()
-        return function_calls
+    return _bulk_insert(session, ReferenceModel, rows)
 
 
 @pytest.fixture
-def sample_type_references(db_manager, sample_definitions):
+def sample_type_references(session: Session, sample_definitions):
     """Create sample TypeReferenceModel instances for testing."""
-    with session_scope(db_manager) as session:
-        add_func, multiply_func, calculator_class, calculate_method = sample_definitions
-
-        type_references = []
+    add_func, multiply_func, calculator_class, calculate_method = sample_definitions
 
+    rows = [
         # calculate method uses number type (built-in)
-        type_number = ReferenceModel(
-            reference_name="number",
-            reference_type="local",
-            source_definition=calculate_method,
-        )
-
+        {
+            "reference_name": "number",
+            "reference_type": "local",
+            "source_definition_id": calculate_method.id,
+        },
         # calculate method uses string type (built-in)
-        type_string = ReferenceModel(
-            reference_name="string",
-            reference_type="local",
-            source_definition=calculate_method,
-        )
-
+        {
+            "reference_name": "string",
+            "reference_type": "local",
+            "source_definition_id": calculate_method.id,
+        },
         # Calculator class uses number[] for history
-        type_number_array = ReferenceModel(
-            reference_name="number[]",
-            reference_type="local",
-            source_definition=calculator_class,
-        )
-
-        type_references = [type_number, type_string, type_number_array]
+        {
+            "reference_name": "number[]",
+            "reference_type": "local",
+            "source_definition_id": calculator_class.id,
+        },
+    ]
 
-        for type_ref in type_references:
-            session.add(type_ref)
-
-        session.flush()
-        return type_references
+    return _bulk_insert(session, ReferenceModel, rows)
 
 
 @pytest.fixture
-def sample_imports(db_manager, sample_file):
+def sample_imports(session: Session, sample_file):
     """Create sample ImportModel instances for testing."""
-    with session_scope(db_manager) as session:
-        imports = []
-
+    rows = [
         # Import MathUtils from ./utils
-        math_utils_import = ImportModel(
-            specifier="MathUtils",
-            module="./utils",
-            import_type="named",
-            resolved_file_path="test/utils.ts",
-            is_external=False,
-        )
-        math_utils_import.file = sample_file
-
-        imports = [math_utils_import]
-
-        for import_model in imports:
-            session.add(import_model)
+        {
+            "file_id": sample_file.id,
+            "specifier": "MathUtils",
+            "module": "./utils",
+            "import_type": "named",
+            "resolved_file_path": "test/utils.ts",
+            "is_external": False,
+        }
+    ]
 
-        session.flush()
-        return imports
+    return _bulk_insert(session, ImportModel, rows)
 
 
-@pytest.fixture
-def dependency_file(db_manager):
+@pytest.fixture(scope="module")
+def dependency_file(module_session: Session):
     """Create a dependency file for testing file-level dependencies."""
-    with session_scope(db_manager) as session:
-        utils_file = FileModel(
-            file_path="test/utils.ts",
-            file_content="""
-export class MathUtils {
-    static multiply(x: number, y: number): number {
-        return x * y;
-    }
-    
-    static divide(x: number, y: number): number {
-        if (y === 0) throw new Error('Division by zero');
-        return x / y;
-    }
-}
-""",
-            language="typescript",
-        )
-
-        session.add(utils_file)
-        session.flush()
-
-        # Add definition for MathUtils class
-        math_utils_class = DefinitionModel(
-            name="MathUtils",
-            definition_type="class",
-            start_line=2,
-            end_line=10,
-            source_code="""export class MathUtils {
-    static multiply(x: number, y: number): number {
-        return x * y;
-    }
-    
-    static divide(x: number, y: number): number {
-        if (y === 0) throw new Error('Division by zero');
-        return x / y;
-    }
-}""",
-            is_exported=True,
-            complexity_score=3,
-            docstring=None,
-            source_code_hash="mathutils_hash",
-        )
-        math_utils_class.file = utils_file
-
-        # Add multiply method
-        multiply_method = DefinitionModel(
-            name="multiply",
-            definition_type="function",
-            start_line=3,
-            end_line=5,
-            source_code="static multiply(x: number, y: number): number {\n        return x * y;\n    }",
-            is_exported=False,
-            complexity_score=1,
-            docstring=None,
-            source_code_hash="multiply_method_hash",
-        )
-        multiply_method.file = utils_file
-
-        session.add(math_utils_class)
-        session.add(multiply_method)
-        session.flush()
-
-        return utils_file
+    (utils_file,) = _bulk_insert(
+        module_session,
+        FileModel,
+        [_file_row("test/utils.ts", _UTILS_TS_SRC)],
+    )
+
+    _ = _bulk_insert(
+        module_session,
+        DefinitionModel,
+        [
+            # Add definition for MathUtils class
+            _definition_row(
+                utils_file.id,
+                name="MathUtils",
+                definition_type="class",
+                start_line=2,
+                end_line=10,
+                source_code=_MATH_UTILS_CLASS_SRC,
+                is_exported=True,
+                complexity_score=3,
+                source_code_hash="mathutils_hash",
+            ),
+            # Add multiply method
+            _definition_row(
+                utils_file.id,
+                name="multiply",
+                definition_type="function",
+                start_line=3,
+                end_line=5,
+                source_code=_MATH_UTILS_MULTIPLY_SRC,
+                is_exported=False,
+                complexity_score=1,
+                source_code_hash="multiply_method_hash",
+            ),
+        ],
+    )
+
+    return utils_file
 
 
 @pytest.fixture
 def processing_order(
-    db_manager,
+    session: Session,
     sample_file,
     sample_definitions,
     sample_function_calls,
@@ -347,244 +446,178 @@ def processing_order(
     dependency_file,
 ):
     """Fixture that provides test data and returns files in processing order (simulating topological sort)."""
-    with session_scope(db_manager) as session:
-        # Update the import to point to the dependency file
-        math_utils_import = sample_imports[0]
-        math_utils_import.resolved_file_path = dependency_file.file_path
-
-        # Link function calls to their actual definitions
-        call_add, call_multiply, call_math_utils = sample_function_calls
-
-        # Find the MathUtils multiply method in dependency file
-        math_utils_multiply = (
-            session.query(DefinitionModel)
-            .filter(
-                DefinitionModel.file.has(file_path=dependency_file.file_path),
-                DefinitionModel.name == "multiply",
-            )
-            .first()
+    # Update the import to point to the dependency file
+    math_utils_import = sample_imports[0]
+    math_utils_import.resolved_file_path = dependency_file.file_path
+
+    # Link function calls to their actual definitions
+    call_add, call_multiply, call_math_utils = sample_function_calls
+
+    # Find the MathUtils multiply method in dependency file
+    math_utils_multiply = session.scalars(
+        select(DefinitionModel).where(
+            DefinitionModel.file_id == dependency_file.id,
+            DefinitionModel.name == "multiply",
         )
+    ).one_or_none()
 
-        if math_utils_multiply:
-            call_math_utils.callee_definition = math_utils_multiply
+    if math_utils_multiply:
+        call_math_utils.target_definition_id = math_utils_multiply.id
 
-        session.flush()
+    # The test session never commits; flush so the updates reach the connection
+    session.flush()
 
-        # Return files in dependency order (dependencies first)
-        return [dependency_file, sample_file]
+    # Return files in dependency order (dependencies first)
+    return [dependency_file, sample_file]
 
 
-@pytest.fixture
-def parallel_test_structure(db_manager):
+@pytest.fixture(scope="module")
+def parallel_test_structure(module_session: Session):
     """Create a multi-file, multi-definition structure for testing parallel processing.
-    
+
     Creates a dependency structure with multiple levels:
-    - Level 0 (no deps): base_utils.ts -> UtilsA, UtilsB  
+    - Level 0 (no deps): base_utils.ts -> UtilsA, UtilsB
     - Level 1 (depends on L0): mid_layer.ts -> ServiceA (uses UtilsA), ServiceB (uses UtilsB)
     - Level 2 (depends on L1): top_layer.ts -> MainApp (uses ServiceA, ServiceB)
-    
+
     This structure allows testing parallel processing at each level.
     """
-    with session_scope(db_manager) as session:
-        # Level 0: Base utilities (no dependencies)
-        base_utils_file = FileModel(
-            file_path="test/base_utils.ts",
-            file_content="""
-export class UtilsA {
-    static process(data: string): string {
-        return data.toUpperCase();
-    }
-}
-
-export class UtilsB {
-    static transform(value: number): number {
-        return value * 2;
-    }
-}
-""",
-            language="typescript",
-        )
-        session.add(base_utils_file)
-        session.flush()
-
-        # Create definitions for base utilities
-        utils_a = DefinitionModel(
-            name="UtilsA",
-            definition_type="class", 
-            start_line=2,
-            end_line=6,
-            source_code="export class UtilsA { static process(data: string): string { return data.toUpperCase(); } }",
-            is_exported=True,
-            complexity_score=1,
-            docstring=None,
-            source_code_hash="utils_a_hash",
-        )
-        utils_a.file = base_utils_file
-
-        utils_b = DefinitionModel(
-            name="UtilsB",
-            definition_type="class",
-            start_line=8,
-            end_line=12, 
-            source_code="export class UtilsB { static transform(value: number): number { return value * 2; } }",
-            is_exported=True,
-            complexity_score=1,
-            docstring=None,
-            source_code_hash="utils_b_hash",
-        )
-        utils_b.file = base_utils_file
-
-        session.add(utils_a)
-        session.add(utils_b)
-        session.flush()
-
-        # Level 1: Mid layer services (depend on base utilities)
-        mid_layer_file = FileModel(
-            file_path="test/mid_layer.ts", 
-            file_content="""
-import { UtilsA, UtilsB } from './base_utils';
-
-export class ServiceA {
-    processText(text: string): string {
-        return UtilsA.process(text);
-    }
-}
-
-export class ServiceB {
-    processNumber(num: number): number {
-        return UtilsB.transform(num);
-    }
-}
-""",
-            language="typescript",
-        )
-        session.add(mid_layer_file)
-        session.flush()
-
-        service_a = DefinitionModel(
-            name="ServiceA",
-            definition_type="class",
-            start_line=4,
-            end_line=8,
-            source_code="export class ServiceA { processText(text: string): string { return UtilsA.process(text); } }",
-            is_exported=True,
-            complexity_score=2,
-            docstring=None,
-            source_code_hash="service_a_hash",
-        )
-        service_a.file = mid_layer_file
-
-        service_b = DefinitionModel(
-            name="ServiceB", 
-            definition_type="class",
-            start_line=10,
-            end_line=14,
-            source_code="export class ServiceB { processNumber(num: number): number { return UtilsB.transform(num); } }",
-            is_exported=True,
-            complexity_score=2,
-            docstring=None,
-            source_code_hash="service_b_hash",
-        )
-        service_b.file = mid_layer_file
-
-        session.add(service_a)
-        session.add(service_b)
-        session.flush()
-
-        # Level 2: Top layer (depends on mid layer services)
-        top_layer_file = FileModel(
-            file_path="test/top_layer.ts",
-            file_content="""
-import { ServiceA, ServiceB } from './mid_layer';
-
-export class MainApp {
-    process(text: string, num: number): {text: string, num: number} {
-        const processedText = ServiceA.processText(text);
-        const processedNum = ServiceB.processNumber(num);
-        return { text: processedText, num: processedNum };
-    }
-}
-""",
-            language="typescript", 
-        )
-        session.add(top_layer_file)
-        session.flush()
-
-        main_app = DefinitionModel(
-            name="MainApp",
-            definition_type="class",
-            start_line=4,
-            end_line=10,
-            source_code="""export class MainApp {
-    process(text: string, num: number): {text: string, num: number} {
-        const processedText = ServiceA.processText(text);
-        const processedNum = ServiceB.processNumber(num);
-        return { text: processedText, num: processedNum };
+    base_utils_file, mid_layer_file, top_layer_file = _bulk_insert(
+        module_session,
+        FileModel,
+        [
+            # Level 0: Base utilities (no dependencies)
+            _file_row("test/base_utils.ts", _BASE_UTILS_TS_SRC),
+            # Level 1: Mid layer services (depend on base utilities)
+            _file_row("test/mid_layer.ts", _MID_LAYER_TS_SRC),
+            # Level 2: Top layer (depends on mid layer services)
+            _file_row("test/top_layer.ts", _TOP_LAYER_TS_SRC),
+        ],
+    )
+
+    utils_a, utils_b, service_a, service_b, main_app = _bulk_insert(
+        module_session,
+        DefinitionModel,
+        [
+            _definition_row(
+                base_utils_file.id,
+                name="UtilsA",
+                definition_type="class",
+                start_line=2,
+                end_line=6,
+                source_code="export class UtilsA { static process(data: string): string { return data.toUpperCase(); } }",
+                is_exported=True,
+                complexity_score=1,
+                source_code_hash="utils_a_hash",
+            ),
+            _definition_row(
+                base_utils_file.id,
+                name="UtilsB",
+                definition_type="class",
+                start_line=8,
+                end_line=12,
+                source_code="export class UtilsB { static transform(value: number): number { return value * 2; } }",
+                is_exported=True,
+                complexity_score=1,
+                source_code_hash="utils_b_hash",
+            ),
+            _definition_row(
+                mid_layer_file.id,
+                name="ServiceA",
+                definition_type="class",
+                start_line=4,
+                end_line=8,
+                source_code="export class ServiceA { processText(text: string): string { return UtilsA.process(text); } }",
+                is_exported=True,
+                complexity_score=2,
+                source_code_hash="service_a_hash",
+            ),
+            _definition_row(
+                mid_layer_file.id,
+                name="ServiceB",
+                definition_type="class",
+                start_line=10,
+                end_line=14,
+                source_code="export class ServiceB { processNumber(num: number): number { return UtilsB.transform(num); } }",
+                is_exported=True,
+                complexity_score=2,
+                source_code_hash="service_b_hash",
+            ),
+            _definition_row(
+                top_layer_file.id,
+                name="MainApp",
+                definition_type="class",
+                start_line=4,
+                end_line=10,
+                source_code=_MAIN_APP_SRC,
+                is_exported=True,
+                complexity_score=3,
+                source_code_hash="main_app_hash",
+            ),
+        ],
+    )
+
+    # Create function calls to establish dependencies
+    _ = _bulk_insert(
+        module_session,
+        ReferenceModel,
+        [
+            # ServiceA calls UtilsA.process
+            {
+                "reference_name": "UtilsA.process",
+                "reference_type": "imported",
+                "source_definition_id": service_a.id,
+                "target_definition_id": utils_a.id,
+            },
+            # ServiceB calls UtilsB.transform
+            {
+                "reference_name": "UtilsB.transform",
+                "reference_type": "imported",
+                "source_definition_id": service_b.id,
+                "target_definition_id": utils_b.id,
+            },
+            # MainApp calls ServiceA.processText
+            {
+                "reference_name": "ServiceA.processText",
+                "reference_type": "imported",
+                "source_definition_id": main_app.id,
+                "target_definition_id": service_a.id,
+            },
+            # MainApp calls ServiceB.processNumber
+            {
+                "reference_name": "ServiceB.processNumber",
+                "reference_type": "imported",
+                "source_definition_id": main_app.id,
+                "target_definition_id": service_b.id,
+            },
+        ],
+    )
+
+    return {
+        "files": [base_utils_file, mid_layer_file, top_layer_file],
+        "definitions": {
+            "level_0": [utils_a, utils_b],  # Can be processed in parallel
+            "level_1": [service_a, service_b],  # Can be processed in parallel after level_0
+            "level_2": [main_app],  # Must be processed after level_1
+        }
     }
-}""",
-            is_exported=True,
-            complexity_score=3,
-            docstring=None,
-            source_code_hash="main_app_hash",
-        )
-        main_app.file = top_layer_file
-        session.add(main_app)
-        session.flush()
-
-        # Create function calls to establish dependencies
-        # ServiceA calls UtilsA.process
-        call_utils_a = ReferenceModel(
-            reference_name="UtilsA.process",
-            source_definition=service_a,
-            reference_type="imported",
-            target_definition=utils_a,
-        )
 
-        # ServiceB calls UtilsB.transform  
-        call_utils_b = ReferenceModel(
-            reference_name="UtilsB.transform",
-            source_definition=service_b,
-            reference_type="imported",
-            target_definition=utils_b,
-        )
 
-        # MainApp calls ServiceA.processText
-        call_service_a = ReferenceModel(
-            reference_name="ServiceA.processText",
-            source_definition=main_app,
-            reference_type="imported",
-            target_definition=service_a,
-        )
+@pytest.fixture(scope="module")
+def definition_graph(db_manager: DatabaseManager, parallel_test_structure):
+    """Build the definition dependency graph for the parallel test structure once."""
+    return DAGBuilder(db_manager).build_function_dependency_graph()
 
-        # MainApp calls ServiceB.processNumber
-        call_service_b = ReferenceModel(
-            reference_name="ServiceB.processNumber",
-            source_definition=main_app,
-            reference_type="imported",
-            target_definition=service_b,
-        )
 
-        session.add(call_utils_a)
-        session.add(call_utils_b)
-        session.add(call_service_a)
-        session.add(call_service_b)
-        session.flush()
-
-        return {
-            "files": [base_utils_file, mid_layer_file, top_layer_file],
-            "definitions": {
-                "level_0": [utils_a, utils_b],  # Can be processed in parallel
-                "level_1": [service_a, service_b],  # Can be processed in parallel after level_0
-                "level_2": [main_app],  # Must be processed after level_1
-            }
-        }
+@pytest.fixture(scope="module")
+def file_graph(db_manager: DatabaseManager, definition_graph):
+    """Build the file dependency graph for the parallel test structure once."""
+    return DAGBuilder(db_manager).build_file_dependency_graph(definition_graph)
 
 
 @pytest.fixture(autouse=True)
 def clear_summary_caches():
     """Automatically clear summary caches before each test."""
-    from ai_analysis.summaries import clear_summary_caches
-
-    clear_summary_caches()
+    _clear_summary_caches()
     yield
-    clear_summary_caches()
+    _clear_summary_caches()
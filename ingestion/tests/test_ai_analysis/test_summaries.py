@@ -7,86 +7,83 @@ from ai_analysis.summaries import parse_llm_response
 class TestParseLLMResponse:
     """Test the parse_llm_response function."""
 
-    def test_parse_normal_response(self):
-        """Test parsing a well-formed LLM response with gist and full summary."""
-        response = """<gist>
+    @pytest.mark.parametrize(
+        ("response", "expected_short", "expected_full"),
+        [
+            # Well-formed LLM response with gist and full summary
+            pytest.param(
+                """<gist>
 This is a short summary of the file.
 </gist>
 
 ### Summary
 This is the full detailed summary of the file.
 It contains multiple paragraphs and sections.
-"""
-        short_summary, full_summary = parse_llm_response(response)
-
-        assert short_summary == "\nThis is a short summary of the file.\n"
-        assert full_summary == "\n\n### Summary\nThis is the full detailed summary of the file.\nIt contains multiple paragraphs and sections.\n"
-
-    def test_parse_minimal_response(self):
-        """Test parsing a minimal response with just the gist tags."""
-        response = "<gist>Short summary</gist>Full summary"
-        short_summary, full_summary = parse_llm_response(response)
-
-        assert short_summary == "Short summary"
-        assert full_summary == "Full summary"
-
-    def test_parse_empty_gist(self):
-        """Test parsing response with empty gist content."""
-        response = "<gist></gist>Full summary content"
-        short_summary, full_summary = parse_llm_response(response)
-
-        assert short_summary == ""
-        assert full_summary == "Full summary content"
-
-    def test_parse_multiline_gist(self):
-        """Test parsing response with multiline gist content."""
-        response = """<gist>
+""",
+                "\nThis is a short summary of the file.\n",
+                "\n\n### Summary\nThis is the full detailed summary of the file.\nIt contains multiple paragraphs and sections.\n",
+                id="normal",
+            ),
+            # Minimal response with just the gist tags
+            pytest.param(
+                "<gist>Short summary</gist>Full summary",
+                "Short summary",
+                "Full summary",
+                id="minimal",
+            ),
+            pytest.param(
+                "<gist></gist>Full summary content",
+                "",
+                "Full summary content",
+                id="empty_gist",
+            ),
+            pytest.param(
+                """<gist>
 Line 1 of gist
 Line 2 of gist
 </gist>
-Full summary starts here"""
+Full summary starts here""",
+                "\nLine 1 of gist\nLine 2 of gist\n",
+                "\nFull summary starts here",
+                id="multiline_gist",
+            ),
+            pytest.param(
+                "<gist>Only gist content</gist>",
+                "Only gist content",
+                "",
+                id="only_gist_no_content_after",
+            ),
+            # Whitespace around the tags is preserved on both sides
+            pytest.param(
+                "  <gist>  Short summary  </gist>  Full summary  ",
+                "  Short summary  ",
+                "  Full summary  ",
+                id="whitespace_around_tags",
+            ),
+        ],
+    )
+    def test_parse(self, response: str, expected_short: str, expected_full: str):
+        """Test splitting responses into the gist and the text after it."""
         short_summary, full_summary = parse_llm_response(response)
 
-        assert short_summary == "\nLine 1 of gist\nLine 2 of gist\n"
-        assert full_summary == "\nFull summary starts here"
-
-    def test_parse_no_gist_tags(self):
-        """Test parsing response without gist tags (should raise IndexError)."""
-        response = "This is just a regular response without tags"
-
+        assert short_summary == expected_short
+        assert full_summary == expected_full
+
+    @pytest.mark.parametrize(
+        "response",
+        [
+            pytest.param(
+                "This is just a regular response without tags", id="no_gist_tags"
+            ),
+            pytest.param("<gist>Short summaryFull summary", id="missing_closing_tag"),
+            pytest.param("", id="empty_response"),
+        ],
+    )
+    def test_parse_malformed_response(self, response: str):
+        """Test that responses without a complete gist block raise IndexError."""
         with pytest.raises(IndexError):
             parse_llm_response(response)
 
-    def test_parse_missing_closing_gist_tag(self):
-        """Test parsing response with missing closing gist tag."""
-        response = "<gist>Short summaryFull summary"
-
-        with pytest.raises(IndexError):
-            parse_llm_response(response)
-
-    def test_parse_empty_response(self):
-        """Test parsing empty response string."""
-        response = ""
-
-        with pytest.raises(IndexError):
-            parse_llm_response(response)
-
-    def test_parse_only_gist_no_content_after(self):
-        """Test parsing response with only gist content and no content after."""
-        response = "<gist>Only gist content</gist>"
-        short_summary, full_summary = parse_llm_response(response)
-
-        assert short_summary == "Only gist content"
-        assert full_summary == ""
-
-    def test_parse_with_whitespace_around_tags(self):
-        """Test parsing response with whitespace around gist tags."""
-        response = "  <gist>  Short summary  </gist>  Full summary  "
-        short_summary, full_summary = parse_llm_response(response)
-
-        assert short_summary == "  Short summary  "
-        assert full_summary == "  Full summary  "
-
     def test_parse_complex_markdown_response(self):
         """Test parsing a complex markdown response similar to actual LLM output."""
         response = """<gist>
@@ -3,7 +3,6 @@
 import pytest
 from pathlib import Path
 import sys
-import os
 
 # Add src to Python path
 src_path = Path(__file__).parent.parent.parent / "src"
@@ -16,9 +15,14 @@ def pytest_configure(config):
     )
 
 @pytest.fixture(scope="session")
-def test_database_path():
+def project_root():
+    """Absolute path of the ingestion project, so tests never depend on cwd."""
+    return Path(__file__).parent.parent.parent
+
+@pytest.fixture(scope="session")
+def test_database_path(project_root):
     """Provide the test database path."""
-    db_path = Path(__file__).parent.parent.parent / "real-summaries-2.db"
+    db_path = project_root / "real-summaries-2.db"
     return db_path
 
 @pytest.fixture(scope="session", autouse=True)
@@ -29,12 +33,3 @@ def check_test_environment(test_database_path):
             f"Database file {test_database_path} not found. "
             "Run the analysis pipeline first to generate test data."
         )
-
-@pytest.fixture(autouse=True)
-def ensure_working_directory():
-    """Ensure tests run from the project root directory."""
-    project_root = Path(__file__).parent.parent.parent
-    original_cwd = os.getcwd()
-    os.chdir(project_root)
-    yield
-    os.chdir(original_cwd)
\ No newline at end of file
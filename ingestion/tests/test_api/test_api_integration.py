@@ -1,26 +1,78 @@
 """Integration tests for the Analysis Agent API."""
 
+import httpx
+import orjson
 import pytest
 from fastapi.testclient import TestClient
-from pathlib import Path
 import os
 import sys
 
 
 from api.main import app
 
-@pytest.fixture
+
+def _json(response: httpx.Response):
+    """Decode a response body with orjson instead of the stdlib json module."""
+    return orjson.loads(response.content)
+
+
+def _post(client: httpx.Client | httpx.AsyncClient, url: str, body: object):
+    """POST ``body`` encoded with orjson; await the result for async clients."""
+    return client.post(
+        url,
+        content=orjson.dumps(body),
+        headers={"content-type": "application/json"},
+    )
+
+@pytest.fixture(scope="session")
 def client():
-    """Create test client."""
-    return TestClient(app)
+    """Create one test client; app startup and lifespan run once per session.
+
+    Tests only read through the client and must not mutate app state.
+    """
+    # Build and cache the OpenAPI schema up front so /schema requests reuse it
+    _ = app.openapi()
+    with TestClient(app) as test_client:
+        yield test_client
 
 @pytest.fixture
-def check_database_exists():
-    """Check if the database file exists before running tests."""
-    db_path = Path("real-summaries-2.db")
-    if not db_path.exists():
-        pytest.skip("Database file real-summaries-2.db not found")
+async def aclient():
+    """Create an async client that calls the app in-process over ASGI."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as async_client:
+        yield async_client
+
+@pytest.fixture(scope="session")
+def check_database_exists(check_test_environment):
+    """Require the test database; the session-wide check stats it only once."""
+
+@pytest.fixture(scope="session")
+def sample_file_id(client: TestClient, check_database_exists) -> int:
+    """Look up one file id for the detail and filter tests."""
+    response = client.get("/files?limit=1")
+    assert response.status_code == 200
+    files = _json(response)
+
+    if not files:
+        pytest.skip("No files in database to test with")
 
+    return files[0]["id"]
+
+@pytest.fixture(scope="session")
+def sample_definition_id(client: TestClient, check_database_exists) -> int:
+    """Look up one definition id for the detail and filter tests."""
+    response = client.get("/definitions?limit=1")
+    assert response.status_code == 200
+    definitions = _json(response)
+
+    if not definitions:
+        pytest.skip("No definitions in database to test with")
+
+    return definitions[0]["id"]
+
+@pytest.mark.xdist_group("schema")
 class TestHealthAndSchema:
     """Test basic API functionality."""
     
@@ -28,7 +80,7 @@ class TestHealthAndSchema:
         """Test health check endpoint."""
         response = client.get("/health")
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["status"] == "healthy"
         assert data["mode"] == "read-only"
         assert "database" in data
@@ -37,72 +89,109 @@ class TestHealthAndSchema:
         """Test OpenAPI schema endpoint."""
         response = client.get("/schema")
         assert response.status_code == 200
-        schema = response.json()
+        schema = _json(response)
         assert "openapi" in schema
         assert "info" in schema
         assert "paths" in schema
         assert schema["info"]["title"] == "Analysis Agent API"
 
+@pytest.mark.xdist_group("lists")
+class TestListEndpoints:
+    """Test the shape of items returned by the list endpoints."""
+
+    @pytest.mark.parametrize(
+        ("endpoint", "required_keys", "list_keys"),
+        [
+            (
+                "/files",
+                {"id", "file_path", "language", "created_at", "last_modified"},
+                set(),
+            ),
+            (
+                "/definitions",
+                {
+                    "id",
+                    "name",
+                    "definition_type",
+                    "start_line",
+                    "end_line",
+                    "is_exported",
+                    "function_calls",
+                    "type_references",
+                },
+                {"function_calls", "type_references"},
+            ),
+            (
+                "/imports",
+                {"id", "file_id", "specifier", "module", "import_type", "is_external"},
+                set(),
+            ),
+            (
+                "/function-calls",
+                {"id", "callee_name", "caller_definition_id"},
+                set(),
+            ),
+            (
+                "/type-references",
+                {"id", "definition_id", "type_name", "source"},
+                set(),
+            ),
+        ],
+    )
+    def test_list_item_shape(
+        self,
+        client: TestClient,
+        check_database_exists,
+        endpoint: str,
+        required_keys: set[str],
+        list_keys: set[str],
+    ):
+        """Test that list endpoints return items with the expected fields."""
+        # Only the first item is inspected, so fetch just that one
+        response = client.get(endpoint, params={"limit": 1})
+        assert response.status_code == 200
+        items = _json(response)
+        assert isinstance(items, list)
+
+        if items:  # If there are rows in the database
+            item = items[0]
+            assert required_keys <= item.keys()
+            for key in list_keys:
+                assert isinstance(item[key], list)
+
+@pytest.mark.xdist_group("files")
 class TestFilesEndpoints:
     """Test files-related endpoints."""
     
-    def test_get_files_basic(self, client: TestClient, check_database_exists):
-        """Test basic files endpoint."""
-        response = client.get("/files")
-        assert response.status_code == 200
-        files = response.json()
-        assert isinstance(files, list)
-        
-        if files:  # If there are files in the database
-            file = files[0]
-            assert "id" in file
-            assert "file_path" in file
-            assert "language" in file
-            assert "created_at" in file
-            assert "last_modified" in file
-
     def test_get_files_with_limit(self, client: TestClient, check_database_exists):
         """Test files endpoint with limit parameter."""
         response = client.get("/files?limit=5")
         assert response.status_code == 200
-        files = response.json()
-        assert isinstance(files, list)
+        files = _json(response)
         assert len(files) <= 5
 
     def test_get_files_with_offset(self, client: TestClient, check_database_exists):
         """Test files endpoint with offset parameter."""
         response = client.get("/files?offset=0&limit=10")
         assert response.status_code == 200
-        files = response.json()
-        assert isinstance(files, list)
+        _ = _json(response)
 
     def test_get_files_with_language_filter(self, client: TestClient, check_database_exists):
         """Test files endpoint with language filter."""
         response = client.get("/files?language=typescript")
         assert response.status_code == 200
-        files = response.json()
-        assert isinstance(files, list)
+        files = _json(response)
         
         # All returned files should have the specified language
-        for file in files:
-            assert file.get("language") == "typescript"
+        assert all(file["language"] == "typescript" for file in files)
 
-    def test_get_file_by_id(self, client: TestClient, check_database_exists):
+    def test_get_file_by_id(self, client: TestClient, sample_file_id: int):
         """Test getting a specific file by ID."""
-        # First get a list of files to get a valid ID
-        files_response = client.get("/files?limit=1")
-        assert files_response.status_code == 200
-        files = files_response.json()
-        
-        if not files:
-            pytest.skip("No files in database to test with")
-        
-        file_id = files[0]["id"]
-        
-        # Now get the specific file
+        file_id = sample_file_id
+
         response = client.get(f"/files/{file_id}")
         assert response.status_code == 200
-        file_detail = response.json()
+        file_detail = _json(response)
         
         assert file_detail["id"] == file_id
         assert "file_content" in file_detail
@@ -123,68 +212,36 @@ class TestFilesEndpoints:
         """Test getting a non-existent file returns 404."""
         response = client.get("/files/999999")
         assert response.status_code == 404
-        assert "not found" in response.json()["detail"].lower()
+        assert "not found" in _json(response)["detail"].lower()
 
+@pytest.mark.xdist_group("definitions")
 class TestDefinitionsEndpoints:
     """Test definitions-related endpoints."""
     
-    def test_get_definitions_basic(self, client: TestClient, check_database_exists):
-        """Test basic definitions endpoint."""
-        response = client.get("/definitions")
-        assert response.status_code == 200
-        definitions = response.json()
-        assert isinstance(definitions, list)
-        
-        if definitions:  # If there are definitions in the database
-            definition = definitions[0]
-            assert "id" in definition
-            assert "name" in definition
-            assert "definition_type" in definition
-            assert "start_line" in definition
-            assert "end_line" in definition
-            assert "is_exported" in definition
-            assert "function_calls" in definition
-            assert "type_references" in definition
-            assert isinstance(definition["function_calls"], list)
-            assert isinstance(definition["type_references"], list)
-
     def test_get_definitions_with_filters(self, client: TestClient, check_database_exists):
         """Test definitions endpoint with various filters."""
         # Test with definition_type filter
         response = client.get("/definitions?definition_type=function")
         assert response.status_code == 200
-        definitions = response.json()
-        assert isinstance(definitions, list)
+        definitions = _json(response)
         
-        for definition in definitions:
-            assert definition.get("definition_type") == "function"
+        assert all(definition["definition_type"] == "function" for definition in definitions)
 
     def test_get_definitions_with_export_filter(self, client: TestClient, check_database_exists):
         """Test definitions endpoint with export filter."""
         response = client.get("/definitions?is_exported=true")
         assert response.status_code == 200
-        definitions = response.json()
-        assert isinstance(definitions, list)
+        definitions = _json(response)
         
-        for definition in definitions:
-            assert definition.get("is_exported") is True
+        assert all(definition["is_exported"] is True for definition in definitions)
 
-    def test_get_definition_by_id(self, client: TestClient, check_database_exists):
+    def test_get_definition_by_id(self, client: TestClient, sample_definition_id: int):
         """Test getting a specific definition by ID."""
-        # First get a list of definitions to get a valid ID
-        definitions_response = client.get("/definitions?limit=1")
-        assert definitions_response.status_code == 200
-        definitions = definitions_response.json()
-        
-        if not definitions:
-            pytest.skip("No definitions in database to test with")
-        
-        definition_id = definitions[0]["id"]
-        
-        # Now get the specific definition
+        definition_id = sample_definition_id
+
         response = client.get(f"/definitions/{definition_id}")
         assert response.status_code == 200
-        definition_detail = response.json()
+        definition_detail = _json(response)
         
         assert definition_detail["id"] == definition_id
         assert "source_code" in definition_detail
@@ -196,123 +253,63 @@ class TestDefinitionsEndpoints:
         """Test getting a non-existent definition returns 404."""
         response = client.get("/definitions/999999")
         assert response.status_code == 404
-        assert "not found" in response.json()["detail"].lower()
+        assert "not found" in _json(response)["detail"].lower()
 
+@pytest.mark.xdist_group("imports")
 class TestImportsEndpoints:
     """Test imports-related endpoints."""
     
-    def test_get_imports_basic(self, client: TestClient, check_database_exists):
-        """Test basic imports endpoint."""
-        response = client.get("/imports")
-        assert response.status_code == 200
-        imports = response.json()
-        assert isinstance(imports, list)
-        
-        if imports:  # If there are imports in the database
-            import_item = imports[0]
-            assert "id" in import_item
-            assert "file_id" in import_item
-            assert "specifier" in import_item
-            assert "module" in import_item
-            assert "import_type" in import_item
-            assert "is_external" in import_item
-
     def test_get_imports_with_filters(self, client: TestClient, check_database_exists):
         """Test imports endpoint with filters."""
         response = client.get("/imports?is_external=false")
         assert response.status_code == 200
-        imports = response.json()
-        assert isinstance(imports, list)
+        imports = _json(response)
         
-        for import_item in imports:
-            assert import_item.get("is_external") is False
+        assert all(import_item["is_external"] is False for import_item in imports)
 
+@pytest.mark.xdist_group("definitions")
 class TestFunctionCallsEndpoints:
     """Test function calls-related endpoints."""
     
-    def test_get_function_calls_basic(self, client: TestClient, check_database_exists):
-        """Test basic function calls endpoint."""
-        response = client.get("/function-calls")
-        assert response.status_code == 200
-        function_calls = response.json()
-        assert isinstance(function_calls, list)
-        
-        if function_calls:  # If there are function calls in the database
-            call = function_calls[0]
-            assert "id" in call
-            assert "callee_name" in call
-            assert "caller_definition_id" in call
-
-    def test_get_function_calls_with_filters(self, client: TestClient, check_database_exists):
+    def test_get_function_calls_with_filters(self, client: TestClient, sample_definition_id: int):
         """Test function calls endpoint with filters."""
-        # First get a definition ID to filter by
-        definitions_response = client.get("/definitions?limit=1")
-        definitions = definitions_response.json()
-        
-        if not definitions:
-            pytest.skip("No definitions in database to test with")
-        
-        definition_id = definitions[0]["id"]
-        
+        definition_id = sample_definition_id
+
         response = client.get(f"/function-calls?caller_definition_id={definition_id}")
         assert response.status_code == 200
-        function_calls = response.json()
-        assert isinstance(function_calls, list)
+        function_calls = _json(response)
         
-        for call in function_calls:
-            assert call.get("caller_definition_id") == definition_id
+        assert all(call["caller_definition_id"] == definition_id for call in function_calls)
 
+@pytest.mark.xdist_group("definitions")
 class TestTypeReferencesEndpoints:
     """Test type references-related endpoints."""
     
-    def test_get_type_references_basic(self, client: TestClient, check_database_exists):
-        """Test basic type references endpoint."""
-        response = client.get("/type-references")
-        assert response.status_code == 200
-        type_refs = response.json()
-        assert isinstance(type_refs, list)
-        
-        if type_refs:  # If there are type references in the database
-            type_ref = type_refs[0]
-            assert "id" in type_ref
-            assert "definition_id" in type_ref
-            assert "type_name" in type_ref
-            assert "source" in type_ref
-
-    def test_get_type_references_with_filters(self, client: TestClient, check_database_exists):
+    def test_get_type_references_with_filters(self, client: TestClient, sample_definition_id: int):
         """Test type references endpoint with filters."""
-        # First get a definition ID to filter by
-        definitions_response = client.get("/definitions?limit=1")
-        definitions = definitions_response.json()
-        
-        if not definitions:
-            pytest.skip("No definitions in database to test with")
-        
-        definition_id = definitions[0]["id"]
-        
+        definition_id = sample_definition_id
+
         response = client.get(f"/type-references?definition_id={definition_id}")
         assert response.status_code == 200
-        type_refs = response.json()
-        assert isinstance(type_refs, list)
+        type_refs = _json(response)
         
-        for type_ref in type_refs:
-            assert type_ref.get("definition_id") == definition_id
+        assert all(type_ref["definition_id"] == definition_id for type_ref in type_refs)
 
+@pytest.mark.xdist_group("files")
 class TestPaginationAndValidation:
     """Test pagination and input validation."""
     
-    def test_pagination_limits(self, client: TestClient, check_database_exists):
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "/files?limit=2000",  # Maximum limit
+            "/files?limit=0",  # Minimum limit
+            "/files?offset=-1",  # Negative offset
+        ],
+    )
+    def test_pagination_limits(self, client: TestClient, check_database_exists, url: str):
         """Test that pagination limits are enforced."""
-        # Test maximum limit
-        response = client.get("/files?limit=2000")
-        assert response.status_code == 422  # Validation error
-        
-        # Test minimum limit
-        response = client.get("/files?limit=0")
-        assert response.status_code == 422  # Validation error
-        
-        # Test negative offset
-        response = client.get("/files?offset=-1")
+        response = client.get(url)
         assert response.status_code == 422  # Validation error
 
     def test_valid_pagination(self, client: TestClient, check_database_exists):
@@ -323,10 +320,12 @@ class TestPaginationAndValidation:
         response = client.get("/files?limit=1000&offset=100")
         assert response.status_code == 200
 
+@pytest.mark.xdist_group("semantic_search")
 class TestSemanticSearchBatch:
     """Test semantic search batch endpoint."""
     
-    def test_batch_search_basic(self, client: TestClient, check_database_exists):
+    @pytest.mark.asyncio
+    async def test_batch_search_basic(self, aclient: httpx.AsyncClient, check_database_exists):
         """Test basic batch semantic search functionality."""
         batch_request = {
             "queries": ["function", "class", "import"],
@@ -334,7 +333,7 @@ class TestSemanticSearchBatch:
             "similarity_threshold": 0.0
         }
         
-        response = client.post("/search/semantic/batch", json=batch_request)
+        response = await _post(aclient, "/search/semantic/batch", batch_request)
         
         # Should return 200 even if embeddings aren't available (returns empty results)
         if response.status_code == 503:
@@ -342,7 +341,7 @@ class TestSemanticSearchBatch:
             pytest.skip("Vector database not available")
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         
         # Verify response structure
         assert "batch_metadata" in data
@@ -364,7 +363,8 @@ class TestSemanticSearchBatch:
             assert isinstance(result["files"], list)
             assert isinstance(result["definitions"], list)
     
-    def test_batch_search_with_filters(self, client: TestClient, check_database_exists):
+    @pytest.mark.asyncio
+    async def test_batch_search_with_filters(self, aclient: httpx.AsyncClient, check_database_exists):
         """Test batch search with language and definition type filters."""
         batch_request = {
             "queries": ["function", "variable"],
@@ -374,59 +374,52 @@ class TestSemanticSearchBatch:
             "similarity_threshold": 0.1
         }
         
-        response = client.post("/search/semantic/batch", json=batch_request)
+        response = await _post(aclient, "/search/semantic/batch", batch_request)
         
         if response.status_code == 503:
             pytest.skip("Vector database not available")
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         
         # Verify filters are reflected in metadata
         assert data["batch_metadata"]["language_filter"] == "typescript"
         assert data["batch_metadata"]["definition_type_filter"] == "function"
         assert data["batch_metadata"]["similarity_threshold"] == 0.1
     
-    def test_batch_search_empty_queries(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_batch_search_empty_queries(self, aclient: httpx.AsyncClient):
         """Test batch search with empty queries list."""
         batch_request = {
             "queries": [],
             "limit": 5
         }
         
-        response = client.post("/search/semantic/batch", json=batch_request)
+        response = await _post(aclient, "/search/semantic/batch", batch_request)
         
         if response.status_code == 503:
             pytest.skip("Vector database not available")
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["batch_metadata"]["total_queries"] == 0
         assert len(data["results"]) == 0
     
-    def test_batch_search_validation(self, client: TestClient):
+    @pytest.mark.parametrize(
+        "batch_request",
+        [
+            {"queries": ["test"], "limit": 0},  # Invalid limit
+            {"queries": ["test"], "similarity_threshold": 1.5},  # Invalid threshold
+            {"limit": 5},  # Missing queries field
+        ],
+    )
+    def test_batch_search_validation(self, client: TestClient, batch_request: dict):
         """Test batch search input validation."""
-        # Test invalid limit
-        response = client.post("/search/semantic/batch", json={
-            "queries": ["test"],
-            "limit": 0
-        })
-        assert response.status_code == 422
-        
-        # Test invalid similarity threshold
-        response = client.post("/search/semantic/batch", json={
-            "queries": ["test"],
-            "similarity_threshold": 1.5
-        })
-        assert response.status_code == 422
-        
-        # Test missing queries field
-        response = client.post("/search/semantic/batch", json={
-            "limit": 5
-        })
+        response = _post(client, "/search/semantic/batch", batch_request)
         assert response.status_code == 422
 
 
+@pytest.mark.xdist_group("schema")
 class TestCORSAndSecurity:
     """Test CORS configuration and security aspects."""
     
@@ -437,21 +430,21 @@ class TestCORSAndSecurity:
         # FastAPI TestClient doesn't automatically add CORS headers in tests,
         # but we can verify the middleware is configured
 
-    def test_read_only_operations(self, client: TestClient):
-        """Test that most operations are read-only except semantic batch."""
-        # Test POST is not allowed on files
-        response = client.post("/files", json={})
-        assert response.status_code == 405  # Method not allowed
-        
-        # Test PUT is not allowed
-        response = client.put("/files/1", json={})
+    @pytest.mark.parametrize(
+        ("method", "url"),
+        [
+            ("POST", "/files"),
+            ("PUT", "/files/1"),
+            ("DELETE", "/files/1"),
+        ],
+    )
+    def test_read_only_operations(self, client: TestClient, method: str, url: str):
+        """Test that write methods are rejected on data endpoints."""
+        response = client.request(method, url)
         assert response.status_code == 405  # Method not allowed
-        
-        # Test DELETE is not allowed
-        response = client.delete("/files/1")
-        assert response.status_code == 405  # Method not allowed
-        
-        # Test POST is allowed on semantic batch endpoint
-        response = client.post("/search/semantic/batch", json={"queries": []})
+
+    def test_semantic_batch_accepts_post(self, client: TestClient):
+        """Test that POST is allowed on the semantic batch endpoint."""
+        response = _post(client, "/search/semantic/batch", {"queries": []})
         # Should not be 405 (Method not allowed)
         assert response.status_code != 405
\ No newline at end of file
@@ -4,8 +4,14 @@ Shared test fixtures for AST parsing tests.
 """
 
 import pytest
-import pytest_asyncio
 import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field
+import hashlib
+from importlib.metadata import version
+import itertools
+import os
+import pickle
 from pathlib import Path
 import sys
 
@@ -15,52 +21,295 @@ from database.manager import DatabaseManager
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
 
 from ast_parsing import parse_file
+from ast_parsing.language_parser import load_required_language_parsers
+from ast_parsing.utils.git_utils import GitChanges, RenamedFile
 
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def db_manager():
+    """Create a database manager instance for the test session.
+
+    The in-memory engine uses a StaticPool, so every parse fixture and test
+    reuses one SQLite connection. Kept separate from the root db_manager because
+    parse_file commits outside that fixture's per-module transaction.
+    """
+    db_manager = DatabaseManager(expire_on_commit=False)  # noqa: F821
+    yield db_manager
+    db_manager.close()
+
+
+# Shared test files parsed once per session, keyed by the fixture that exposes them
+_SHARED_TEST_FILES = {
+    "comprehensive": "test-comprehensive.tsx",
+    "import_export": "test-import-export.ts",
+    "jsx": "test-jsx-components.tsx",
+    "types": "test-types.ts",
+    "default_export": "test-default-export.ts",
+}
+
+
+# Sources whose changes must invalidate cached parse results: every src
+# package the parse path imports from
+_SRC_DIR = Path(__file__).parent.parent.parent / "src"
+_PARSER_SOURCES = (
+    *sorted((_SRC_DIR / "ast_parsing").rglob("*.py")),
+    *sorted((_SRC_DIR / "database").rglob("*.py")),
+)
+
+# Installed grammars and bindings, whose upgrades change parse results too
+_PARSER_DISTRIBUTIONS = ("tree-sitter", "tree-sitter-language-pack")
+
+
+def _parser_fingerprint():
+    """Hash the parser sources and tree-sitter versions that shape a parse result."""
+    digest = hashlib.sha1()
+    for distribution in _PARSER_DISTRIBUTIONS:
+        digest.update(f"{distribution}=={version(distribution)}\n".encode())
+    for source in _PARSER_SOURCES:
+        digest.update(source.relative_to(_SRC_DIR).as_posix().encode())
+        digest.update(source.read_bytes())
+    return digest
 
 
 @pytest.fixture(scope="session")
-def db_manager() -> DatabaseManager:
-    """Create a database manager instance for the test session."""
-    db_manager = DatabaseManager(expire_on_commit=False)  # noqa: F821
-    return db_manager
+async def shared_parse_results(request, db_manager):
+    """Parse all shared test files concurrently, once for all tests.
+
+    Results are pickled into pytest's cache directory, keyed by the test file
+    and parser sources, so later runs skip tree-sitter entirely. Running with
+    ``-p no:cacheprovider`` or ``--cache-clear`` always parses afresh.
+    """
+    test_files_dir = Path(__file__).parent / "test_files"
+    test_files = {
+        key: (test_files_dir / file_name).as_posix()
+        for key, file_name in _SHARED_TEST_FILES.items()
+    }
+    cache = getattr(request.config, "cache", None)
+
+    results = {}
+    cache_files: dict[str, Path] = {}
+    if cache is not None:
+        cache_dir = cache.mkdir("parse_results")
+        fingerprint = _parser_fingerprint()
+        for key, test_file in test_files.items():
+            digest = fingerprint.copy()
+            digest.update(Path(test_file).read_bytes())
+            cache_file = cache_dir / f"{digest.hexdigest()}.pkl"
+            if cache_file.exists():
+                results[key] = pickle.loads(cache_file.read_bytes())
+            else:
+                cache_files[key] = cache_file
+
+    missing = [key for key in test_files if key not in results]
+    if not missing:
+        return results
+
+    # Load each grammar once before parsing; the concurrent parses would
+    # otherwise race to load the same grammar in separate executor threads
+    _ = load_required_language_parsers([test_files[key] for key in missing])
+    parsed = await asyncio.gather(
+        *(parse_file(test_files[key], db_manager=db_manager) for key in missing)
+    )
+    for key, result in zip(missing, parsed):
+        results[key] = result
+        if key in cache_files:
+            # Write then rename so concurrent xdist workers never read a partial file
+            tmp_file = cache_files[key].with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_bytes(pickle.dumps(result))
+            tmp_file.replace(cache_files[key])
+    return results
+
+
+@dataclass
+class CallIndexedParseResult:
+    """A parse result with its function calls indexed once for read-only tests."""
+
+    definitions: list
+    imports: list
+    all_calls: list = field(default_factory=list)
+    calls_by_source: dict[str, list] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    method_calls: list = field(default_factory=list)
+    default_exports: list = field(default_factory=list)
+    definitions_by_name: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_parse_result(cls, parse_result):
+        indexed = cls(parse_result.definitions, parse_result.imports)
+        for definition in indexed.definitions:
+            _ = indexed.definitions_by_name.setdefault(definition.name, definition)
+            if definition.is_default_export:
+                indexed.default_exports.append(definition)
+            for call in definition.function_calls:
+                indexed.all_calls.append(call)
+                indexed.calls_by_source[sys.intern(call.callee_source)].append(call)
+                if "." in call.callee_name:
+                    indexed.method_calls.append(call)
+        return indexed
+
+    @property
+    def local_calls(self):
+        return self.calls_by_source["local"]
+
+    @property
+    def imported_calls(self):
+        return self.calls_by_source["imported"]
+
+    @property
+    def unknown_calls(self):
+        return self.calls_by_source["unknown"]
+
+
+# Definition types a PascalCase-named component can be declared as
+_COMPONENT_DEF_TYPES = frozenset({"function", "variable"})
+
+
+@dataclass
+class DefinitionIndex:
+    """Definitions of a parse result bucketed once for read-only tests."""
+
+    defs_by_type: dict[str, list] = field(default_factory=dict)
+    defs_by_name: dict = field(default_factory=dict)
+    components: list = field(default_factory=list)
+    # Names of the interfaces, type aliases and enums defined in the file
+    type_names: frozenset[str] = frozenset()
+    # Specifiers of named and default imports
+    imported_type_names: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_parse_result(cls, parse_result):
+        index = cls()
+        type_names: set[str] = set()
+        for definition in parse_result.definitions:
+            _ = index.defs_by_name.setdefault(definition.name, definition)
+            index.defs_by_type.setdefault(definition.definition_type, []).append(
+                definition
+            )
+            if (
+                definition.definition_type in _COMPONENT_DEF_TYPES
+                and definition.name[:1].isupper()
+            ):
+                index.components.append(definition)
+            if definition.definition_type in ("interface", "type", "enum"):
+                type_names.add(definition.name)
+        index.type_names = frozenset(type_names)
+        index.imported_type_names = frozenset(
+            imp.specifier
+            for imp in parse_result.imports
+            if imp.import_type in ("named", "default")
+        )
+        return index
 
 
-@pytest_asyncio.fixture(scope="session")
-async def comprehensive_parse_result(db_manager):
-    """Parse the comprehensive test file once for all tests."""
-    test_file_path = Path(__file__).parent / "test_files" / "test-comprehensive.tsx"
-    return await parse_file(test_file_path.as_posix(), db_manager=db_manager)
+@pytest.fixture(scope="session")
+def comprehensive_parse_result(shared_parse_results):
+    """Parse result for the comprehensive test file, with its calls indexed."""
+    return CallIndexedParseResult.from_parse_result(
+        shared_parse_results["comprehensive"]
+    )
+
+
+@pytest.fixture(scope="session")
+def import_export_parse_result(shared_parse_results):
+    """Parse result for the import-export test file."""
+    return shared_parse_results["import_export"]
+
+
+@pytest.fixture(scope="session")
+def jsx_parse_result(shared_parse_results):
+    """Parse result for the JSX components test file."""
+    return shared_parse_results["jsx"]
+
+
+@pytest.fixture(scope="session")
+def jsx_index(jsx_parse_result):
+    """Definitions of the JSX components test file, indexed once."""
+    return DefinitionIndex.from_parse_result(jsx_parse_result)
+
+
+@pytest.fixture(scope="session")
+def jsx_all_calls(jsx_parse_result):
+    """Every function call in the JSX components test file, flattened once."""
+    return tuple(
+        itertools.chain.from_iterable(
+            d.function_calls for d in jsx_parse_result.definitions
+        )
+    )
+
+
+@pytest.fixture(scope="session")
+def types_parse_result(shared_parse_results):
+    """Parse result for the types test file."""
+    return shared_parse_results["types"]
+
+
+@pytest.fixture(scope="session")
+def types_index(types_parse_result):
+    """Definitions of the types test file, indexed once."""
+    return DefinitionIndex.from_parse_result(types_parse_result)
+
+
+@pytest.fixture(scope="session")
+def types_all_used_types(types_parse_result):
+    """Every type reference in the types test file, flattened once."""
+    return tuple(
+        itertools.chain.from_iterable(
+            d.type_references for d in types_parse_result.definitions
+        )
+    )
+
+
+@pytest.fixture(scope="session")
+def default_export_test(shared_parse_results):
+    """Parse result for the default export test file."""
+    return shared_parse_results["default_export"]
+
 
+@pytest.fixture
+def mock_git(monkeypatch):
+    """Mock git lookups so a repo parses fully once, then incrementally.
 
-@pytest_asyncio.fixture(scope="session")
-async def import_export_parse_result(db_manager):
-    """Parse the import-export test file once for all tests."""
-    test_file_path = Path(__file__).parent / "test_files" / "test-import-export.ts"
-    return await parse_file(test_file_path.as_posix(), db_manager=db_manager)
+    The first extract_git_info call reports commit "A" and every later call "B";
+    compare_commits_and_get_changed_files always returns the given changes.
+    """
 
+    def _install(
+        remote_url: str,
+        *,
+        added: list[str] | None = None,
+        modified: list[str] | None = None,
+        deleted: list[str] | None = None,
+        renamed: list[RenamedFile] | None = None,
+    ) -> None:
+        changes = GitChanges(
+            added=added or [],
+            modified=modified or [],
+            deleted=deleted or [],
+            renamed=renamed or [],
+        )
+        commit_hashes = itertools.chain(["A"], itertools.repeat("B"))
 
-@pytest_asyncio.fixture(scope="session")
-async def jsx_parse_result(db_manager):
-    """Parse the JSX components test file once for all tests."""
-    test_file_path = Path(__file__).parent / "test_files" / "test-jsx-components.tsx"
-    return await parse_file(test_file_path.as_posix(), db_manager=db_manager)
+        def fake_extract_git_info(_repo_path: str) -> dict[str, str | None]:
+            return {
+                "remote_origin_url": remote_url,  # used for repository identity
+                "commit_hash": next(commit_hashes),
+                "default_branch": "main",
+            }
 
+        def fake_compare(
+            before_commit_hash: str,
+            after_commit_hash: str,
+            repo_path: str,
+            remote_origin_url: str | None = None,
+        ) -> GitChanges:
+            return changes
 
-@pytest_asyncio.fixture(scope="session")
-async def types_parse_result(db_manager):
-    """Parse the types test file once for all tests."""
-    test_file_path = Path(__file__).parent / "test_files" / "test-types.ts"
-    return await parse_file(test_file_path.as_posix(), db_manager=db_manager)
+        # Patch both in git_utils (for direct use) and in parser (imported binding)
+        for module in ("ast_parsing.utils.git_utils", "ast_parsing.parser"):
+            monkeypatch.setattr(f"{module}.extract_git_info", fake_extract_git_info)
+            monkeypatch.setattr(
+                f"{module}.compare_commits_and_get_changed_files", fake_compare
+            )
 
-@pytest_asyncio.fixture(scope="session")
-async def default_export_test(db_manager):
-    """Parse the default export test file once for all tests."""
-    test_file_path = Path(__file__).parent / "test_files" / "test-default-export.ts"
-    return await parse_file(test_file_path.as_posix(), db_manager=db_manager)
+    return _install
@@ -3,6 +3,7 @@ Test function call extraction and resolution.
 Migrated from TypeScript function-calls.test.ts
 """
 
+import logging
 from typing import Any, cast
 import pytest
 
@@ -12,12 +13,13 @@ from database.models import (
     ImportModel,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class TestFunctionCallExtraction:
     """Test function call extraction and resolution functionality."""
 
-    @pytest.mark.asyncio
-    async def test_extract_correct_number_of_definitions(
+    def test_extract_correct_number_of_definitions(
         self, comprehensive_parse_result
     ):
         """Test that we extract the correct number of definitions."""
@@ -25,37 +27,33 @@ class TestFunctionCallExtraction:
 
         # print(f"Definitions found: {(parse_result.definitions)}")
 
+        # Should find main functions, classes, methods, etc.
         assert parse_result.definitions is not None
         assert len(parse_result.definitions) > 0
 
-        # Should find main functions, classes, methods, etc.
-        definition_names = [d.name for d in parse_result.definitions]
-
-        for definition in parse_result.definitions:
-            if definition.name == "functionDef":
-                print("Source of functionDef:", definition.source_code)
-                print(
-                    "Dependencies of functionDef:",
-                    [call.callee_name for call in definition.function_calls],
-                )
-
-        # These tests are more flexible since we don't know the exact content of test files
-        assert len(definition_names) > 0
-
         # Verify that default exports are identified in the file definitions
-        for definition in parse_result.definitions:
-            if definition.is_default_export:
-                assert definition.name == "defaultExportFunction"
+        for definition in parse_result.default_exports:
+            assert definition.name == "defaultExportFunction"
+
+    @pytest.mark.debug
+    def test_dump_function_def(self, comprehensive_parse_result):
+        """Log the source and dependencies of functionDef (run with -m debug)."""
+        definition = comprehensive_parse_result.definitions_by_name.get("functionDef")
+        if definition is not None:
+            logger.debug("Source of functionDef: %s", definition.source_code)
+            logger.debug(
+                "Dependencies of functionDef: %s",
+                [call.callee_name for call in definition.function_calls],
+            )
 
-    @pytest.mark.asyncio
-    async def test_default_export(self, default_export_test):
+    def test_default_export(self, default_export_test):
         """Test that default export is correctly identified."""
         parse_result = default_export_test
 
         assert parse_result is not None
         assert len(parse_result.definitions) > 0
 
-        print("Definitions found:", [d for d in parse_result.definitions])
+        logger.debug("Definitions found: %s", parse_result.definitions)
 
         # Check if the default export function is present
         default_export_func = next(
@@ -64,8 +62,7 @@ class TestFunctionCallExtraction:
         assert default_export_func is not None
         assert default_export_func.name == "NewFunc"
 
-    @pytest.mark.asyncio
-    async def test_correctly_identify_import_types(self, comprehensive_parse_result):
+    def test_correctly_identify_import_types(self, comprehensive_parse_result):
         """Test that import types are correctly identified."""
         parse_result = comprehensive_parse_result
         assert parse_result.imports is not None
@@ -78,85 +75,52 @@ class TestFunctionCallExtraction:
             assert imp.specifier is not None
             assert imp.module is not None
 
-    @pytest.mark.asyncio
-    async def test_extract_function_calls_within_definitions(
+    def test_extract_function_calls_within_definitions(
         self, comprehensive_parse_result
     ):
         """Test that function calls within definitions are correctly extracted."""
         parse_result = comprehensive_parse_result
 
-        # Find definitions with function calls
-        definitions_with_calls: list[DefinitionModel] = [
-            d for d in parse_result.definitions if len(d.function_calls) > 0
-        ]
-
-        if definitions_with_calls:  # Only test if we have calls
-            for definition in definitions_with_calls:
-                assert len(definition.function_calls) > 0
-
-                for call in definition.function_calls:
-                    assert call.callee_name is not None
-                    assert call.callee_source in ["local", "imported", "unknown"]
-
-    @pytest.mark.asyncio
-    async def test_resolve_local_function_calls(self, comprehensive_parse_result):
-        """Test that local function calls are correctly resolved."""
-        parse_result = comprehensive_parse_result
-
-        # Get all function calls
-        all_calls = []
-        for definition in parse_result.definitions:
-            all_calls.extend(definition.function_calls)
-
-        # Check for local function calls
-        local_calls: list[FunctionCallModel] = [
-            call for call in all_calls if call.callee_source == "local"
-        ]
-
-        for call in local_calls:
-            assert call.callee_source == "local"
+        for call in parse_result.all_calls:
             assert call.callee_name is not None
-
-    @pytest.mark.asyncio
-    async def test_resolve_imported_function_calls(self, comprehensive_parse_result):
-        """Test that imported function calls are correctly resolved."""
+            assert call.callee_source in ["local", "imported", "unknown"]
+
+    @pytest.mark.parametrize(
+        ("source", "has_import_details"),
+        [
+            pytest.param("local", None, id="local"),
+            # Imported calls should carry their import information
+            pytest.param("imported", True, id="imported"),
+            # Unknown calls should not have import information
+            pytest.param("unknown", False, id="unknown"),
+        ],
+    )
+    def test_resolve_function_calls_by_source(
+        self, comprehensive_parse_result, source, has_import_details
+    ):
+        """Test that function calls are correctly resolved for each source."""
         parse_result = comprehensive_parse_result
 
-        # Get all function calls
-        all_calls = []
-        for definition in parse_result.definitions:
-            all_calls.extend(definition.function_calls)
-
-        # Check for imported function calls
-        imported_calls: list[FunctionCallModel] = [
-            call for call in all_calls if call.callee_source == "imported"
-        ]
+        calls: list[FunctionCallModel] = parse_result.calls_by_source[source]
 
-        for call in imported_calls:
-            assert call.callee_source == "imported"
+        for call in calls:
+            assert call.callee_source == source
             assert call.callee_name is not None
-            # Should have import information
-            assert call.import_details is not None
+            if has_import_details is not None:
+                assert (call.import_details is not None) == has_import_details
 
-    @pytest.mark.asyncio
-    async def test_handle_method_calls_on_objects(self, comprehensive_parse_result):
+    def test_handle_method_calls_on_objects(self, comprehensive_parse_result):
         """Test that method calls on objects are correctly handled."""
         parse_result = comprehensive_parse_result
 
-        # Get all function calls
-        all_calls: list[FunctionCallModel] = []
-        for definition in parse_result.definitions:
-            all_calls.extend(definition.function_calls)
-
-        # Look for method calls (containing dots)
-        method_calls = [call for call in all_calls if "." in call.callee_name]
+        # Method calls are the calls containing dots
+        method_calls: list[FunctionCallModel] = parse_result.method_calls
 
         for call in method_calls:
             assert "." in call.callee_name
             assert call.callee_source in ["imported", "unknown", "local"]
 
-    @pytest.mark.asyncio
-    async def test_exclude_nested_function_calls(self, comprehensive_parse_result):
+    def test_exclude_nested_function_calls(self, comprehensive_parse_result):
         """Test that nested function calls are properly handled."""
         parse_result = comprehensive_parse_result
 
@@ -166,69 +130,61 @@ class TestFunctionCallExtraction:
         )
         nested_definitions: list[tuple[DefinitionModel, DefinitionModel]] = []
 
-        for i, def1 in enumerate(definitions):
-            for j, def2 in enumerate(definitions):
-                if i != j and (
-                    def1.start_line > def2.start_line and def1.end_line < def2.end_line
-                ):
-                    nested_definitions.append((def1, def2))  # def1 is nested in def2
+        # Sweep definitions in start order, keeping the still-open ones on a stack;
+        # whatever remains open when a definition starts is an enclosing candidate
+        open_definitions: list[DefinitionModel] = []
+        for definition in sorted(
+            definitions, key=lambda d: (d.start_line, -d.end_line)
+        ):
+            while (
+                open_definitions
+                and open_definitions[-1].end_line < definition.start_line
+            ):
+                _ = open_definitions.pop()
+            nested_definitions.extend(
+                (definition, parent)  # definition is nested in parent
+                for parent in open_definitions
+                if parent.start_line < definition.start_line
+                and definition.end_line < parent.end_line
+            )
+            open_definitions.append(definition)
 
         for child_def, parent_def in nested_definitions:
+            parent_call_ids = {id(call) for call in parent_def.function_calls}
+
             # Check that child_def's function calls are not counted in parent_def
             for call in child_def.function_calls:
-                assert call not in parent_def.function_calls
+                assert id(call) not in parent_call_ids
 
-            print(f"Parent: {parent_def.name}, Child: {child_def.name}")
-            print(f"Parent calls: {[c.callee_name for c in parent_def.function_calls]}")
-            print(f"Child calls: {[c.callee_name for c in child_def.function_calls]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Parent: %s, Child: %s", parent_def.name, child_def.name)
+                logger.debug(
+                    "Parent calls: %s",
+                    [c.callee_name for c in parent_def.function_calls],
+                )
+                logger.debug(
+                    "Child calls: %s", [c.callee_name for c in child_def.function_calls]
+                )
 
             # Parent definition should not have child function calls
             assert all(
-                call not in parent_def.function_calls
-                for call in child_def.function_calls
+                id(call) not in parent_call_ids for call in child_def.function_calls
             )
 
-    @pytest.mark.asyncio
-    async def test_extract_class_method_calls(self, comprehensive_parse_result):
+    def test_extract_class_method_calls(self, comprehensive_parse_result):
         """Test that calls within class methods are correctly extracted."""
         parse_result = comprehensive_parse_result
 
-        # Find class-related definitions
-        class_methods: list[DefinitionModel] = [
-            d
-            for d in parse_result.definitions
-            if d.definition_type in ["function", "method"]
-        ]
-
-        for method in class_methods:
-            # Method should have valid structure
-            assert hasattr(method, "function_calls")
-            assert isinstance(method.function_calls, list)
+        for method in parse_result.definitions:
+            # Only class-related definitions
+            if method.definition_type not in ("function", "method"):
+                continue
 
             # Check call structure
             for call in method.function_calls:
                 assert call.callee_name is not None
                 assert call.callee_source in ["local", "imported", "unknown"]
 
-    @pytest.mark.asyncio
-    async def test_handle_unknown_function_calls(self, comprehensive_parse_result):
-        """Test that unknown function calls are properly marked."""
-        parse_result = comprehensive_parse_result
-
-        # Get all function calls
-        all_calls: list[FunctionCallModel] = []
-        for definition in parse_result.definitions:
-            all_calls.extend(definition.function_calls)
-
-        # Check for unknown calls
-        unknown_calls = [call for call in all_calls if call.callee_source == "unknown"]
-
-        for call in unknown_calls:
-            assert call.callee_name is not None
-            assert call.callee_source == "unknown"
-            # Unknown calls should not have import information
-            assert call.import_details is None
-
 
 # Run the tests
 if __name__ == "__main__":
@@ -3,15 +3,11 @@ Test import and export detection.
 Migrated from TypeScript import-export.test.ts
 """
 
-from typing import Any
 import pytest
-import pytest_asyncio
-import asyncio
 from pathlib import Path
 import sys
 
-from database.manager import DatabaseManager
-from database.models import ImportModel, DefinitionModel
+from database.models import DefinitionModel
 
 # Add the src directory to the path so we can import our modules
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
@@ -36,54 +32,47 @@ class TestImportExportDetection:
         assert isinstance(parse_result.definitions, list)
 
     @pytest.mark.asyncio
-    async def test_identify_default_imports(
-        self, import_export_parse_result, db_manager: DatabaseManager
-    ):
+    async def test_identify_default_imports(self, import_export_parse_result):
         """Test that default imports are correctly identified."""
-        with db_manager.get_session():
-            parse_result = import_export_parse_result
-            default_imports = [
-                imp for imp in parse_result.imports if imp.import_type == "default"
-            ]
-
-            # import defaultExport from "module-name-1"
-            default_import = next(
-                (
-                    imp
-                    for imp in default_imports
-                    if imp.specifier == "defaultExport"
-                    and imp.module == "module-name-1"
-                ),
-                None,
-            )
-
-            assert default_import is not None
-            assert default_import.import_type == "default"
-            assert default_import.alias is None
+        parse_result = import_export_parse_result
+        default_imports = [
+            imp for imp in parse_result.imports if imp.import_type == "default"
+        ]
+
+        # import defaultExport from "module-name-1"
+        default_import = next(
+            (
+                imp
+                for imp in default_imports
+                if imp.specifier == "defaultExport" and imp.module == "module-name-1"
+            ),
+            None,
+        )
+
+        assert default_import is not None
+        assert default_import.import_type == "default"
+        assert default_import.alias is None
 
     @pytest.mark.asyncio
-    async def test_identify_namespace_imports(
-        self, import_export_parse_result, db_manager: DatabaseManager
-    ):
+    async def test_identify_namespace_imports(self, import_export_parse_result):
         """Test that namespace imports are correctly identified."""
-        with db_manager.get_session():
-            parse_result = import_export_parse_result
-            namespace_imports = [
-                imp for imp in parse_result.imports if imp.import_type == "namespace"
-            ]
-
-            # import * as name from "module-name-2"
-            namespace_import = next(
-                (
-                    imp
-                    for imp in namespace_imports
-                    if imp.specifier == "name" and imp.module == "module-name-2"
-                ),
-                None,
-            )
-
-            if namespace_import:  # Only test if found
-                assert namespace_import.import_type == "namespace"
+        parse_result = import_export_parse_result
+        namespace_imports = [
+            imp for imp in parse_result.imports if imp.import_type == "namespace"
+        ]
+
+        # import * as name from "module-name-2"
+        namespace_import = next(
+            (
+                imp
+                for imp in namespace_imports
+                if imp.specifier == "name" and imp.module == "module-name-2"
+            ),
+            None,
+        )
+
+        if namespace_import:  # Only test if found
+            assert namespace_import.import_type == "namespace"
 
     @pytest.mark.asyncio
     async def test_identify_named_imports(self, import_export_parse_result):
@@ -195,13 +184,11 @@ class TestImportExportDetection:
         imports = parse_result.imports
 
         # Create unique keys for imports
-        import_keys = set()
-        for imp in imports:
-            key = f"{imp.specifier}::{imp.module}::{imp.import_type}"
-            if key in import_keys:
-                # This might be acceptable in some cases, so just log it
-                print(f"Duplicate import found: {key}")
-            import_keys.add(key)
+        import_keys = [(imp.specifier, imp.module, imp.import_type) for imp in imports]
+        duplicates = len(import_keys) - len(set(import_keys))
+        if duplicates:
+            # This might be acceptable in some cases, so just log it
+            print(f"{duplicates} duplicate imports found")
 
         # The test passes regardless, as some duplicates might be valid
 
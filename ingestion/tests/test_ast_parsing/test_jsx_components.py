@@ -4,7 +4,26 @@ Migrated from TypeScript jsx-components.test.ts
 """
 
 import pytest
-from database.models import DefinitionModel, ImportModel, FunctionCallModel
+from database.models import DefinitionModel, FunctionCallModel
+
+VALID_SOURCES = frozenset({"local", "imported", "unknown"})
+VALID_IMPORT_TYPES = frozenset({"default", "named", "namespace"})
+
+# Every call HookTestComponent makes in test-jsx-components.tsx
+EXPECTED_HOOK_TEST_CALLS = frozenset(
+    {
+        "React.useState",
+        "View",
+        "Text",
+        "TouchableOpacity",
+        "CustomButton",
+        "CustomButton2Fake",
+        "CustomButton3Fake",
+        "NewComponent",
+        "NEWButton",
+        "incrementCount",
+    }
+)
 
 
 class TestJSXComponentParsing:
@@ -21,55 +40,47 @@ class TestJSXComponentParsing:
         assert isinstance(parse_result.exports, list)
 
     @pytest.mark.asyncio
-    async def test_extract_react_component_definitions(self, jsx_parse_result):
+    async def test_extract_react_component_definitions(
+        self, jsx_parse_result, jsx_index
+    ):
         """Test that React component definitions are extracted."""
         parse_result = jsx_parse_result
         definitions = parse_result.definitions
-        assert len(definitions) > 0
+        assert definitions
 
         # Look for component definitions (functions that return JSX)
-        component_definitions: list[DefinitionModel] = [
-            d
-            for d in definitions
-            if d.definition_type in ["function", "variable"]
-            and d.name[0].isupper()  # Components start with uppercase
-        ]
+        component_definitions: list[DefinitionModel] = jsx_index.components
 
-        assert len(component_definitions) > 0
+        assert component_definitions
 
         # Check component structure
         for component in component_definitions:
             assert isinstance(component.name, str)
-            assert len(component.name) > 0
+            assert component.name
             assert component.name[
                 0
             ].isupper()  # React components should start with uppercase
 
     @pytest.mark.asyncio
-    async def test_extract_jsx_element_calls(self, jsx_parse_result):
+    async def test_extract_jsx_element_calls(self, jsx_parse_result, jsx_all_calls):
         """Test that JSX element usage is captured as function calls."""
         parse_result = jsx_parse_result
         definitions = parse_result.definitions
 
-        # Find definitions that have function calls (should include JSX elements)
-        definitions_with_calls: list[DefinitionModel] = [
-            d for d in definitions if len(d.function_calls) > 0
-        ]
-        assert len(definitions_with_calls) > 0
+        # Some definitions should have function calls (including JSX elements)
+        assert any(d.function_calls for d in definitions)
 
         # Look for JSX-related calls
-        all_calls: list[FunctionCallModel] = []
-        for definition in definitions_with_calls:
-            all_calls.extend(definition.function_calls)
+        all_calls: tuple[FunctionCallModel, ...] = jsx_all_calls
 
         # Should have some calls (including JSX elements)
-        assert len(all_calls) > 0
+        assert all_calls
 
         # Check call structure
         for call in all_calls:
             assert hasattr(call, "callee_name")
             assert hasattr(call, "callee_source")
-            assert call.callee_source in ["local", "imported", "unknown"]
+            assert call.callee_source in VALID_SOURCES
 
     @pytest.mark.asyncio
     async def test_handle_react_imports(self, jsx_parse_result):
@@ -77,32 +88,23 @@ class TestJSXComponentParsing:
         parse_result = jsx_parse_result
         imports = parse_result.imports
 
-        # Should have React-related imports in a TSX file
-        react_imports: list[ImportModel] = [
-            imp
-            for imp in imports
-            if "react" in imp.module.lower()
-            or imp.specifier in ["React", "Component", "useState", "useEffect"]
-        ]
-
-        # Might have React imports
-        for imp in react_imports:
-            assert imp.import_type in ["default", "named", "namespace"]
-            assert isinstance(imp.specifier, str)
-            assert isinstance(imp.module, str)
+        # Might have React-related imports in a TSX file
+        for imp in imports:
+            if "react" in imp.module.lower() or imp.specifier in (
+                "React",
+                "Component",
+                "useState",
+                "useEffect",
+            ):
+                assert imp.import_type in VALID_IMPORT_TYPES
+                assert isinstance(imp.specifier, str)
+                assert isinstance(imp.module, str)
 
     @pytest.mark.asyncio
-    async def test_extract_component_props(self, jsx_parse_result):
+    async def test_extract_component_props(self, jsx_index):
         """Test that component props are handled in type information."""
-        parse_result = jsx_parse_result
-        definitions = parse_result.definitions
-
         # Find component definitions
-        components: list[DefinitionModel] = [
-            d
-            for d in definitions
-            if d.definition_type in ["function", "variable"] and d.name[0].isupper()
-        ]
+        components: list[DefinitionModel] = jsx_index.components
 
         if components:
             # Components might have type information for props
@@ -112,69 +114,37 @@ class TestJSXComponentParsing:
                 assert isinstance(component.type_references, list)
 
     @pytest.mark.asyncio
-    async def test_handle_jsx_fragments(self, jsx_parse_result):
+    async def test_handle_jsx_fragments(self, jsx_all_calls):
         """Test that JSX fragments are handled correctly."""
-        parse_result = jsx_parse_result
-        definitions = parse_result.definitions
-
-        # Look for any function calls that might represent fragments
-        all_calls: list[FunctionCallModel] = []
-        for definition in definitions:
-            all_calls.extend(definition.function_calls)
-
-        # Fragment usage might appear as function calls
-        fragment_calls: list[FunctionCallModel] = [
-            call
-            for call in all_calls
-            if "Fragment" in call.callee_name or call.callee_name == "React.Fragment"
-        ]
-
-        # Fragments might or might not be present, so we just check structure if they exist
-        for call in fragment_calls:
-            assert call.callee_source in ["local", "imported", "unknown"]
+        # Fragment usage might appear as function calls. Fragments might or might
+        # not be present, so we just check structure if they exist
+        for call in jsx_all_calls:
+            if "Fragment" in call.callee_name:
+                assert call.callee_source in VALID_SOURCES
 
     @pytest.mark.asyncio
-    async def test_handle_nested_jsx_elements(self, jsx_parse_result):
+    async def test_handle_nested_jsx_elements(self, jsx_parse_result, jsx_index):
         """Test that nested JSX elements are handled correctly."""
         parse_result = jsx_parse_result
         definitions = parse_result.definitions
 
-        # Find definitions with multiple function calls (indicating nested elements)
-        nested_definitions: list[DefinitionModel] = [d for d in definitions]
-
         # for definition in nested_definitions:
         #     print(f"Definition: {definition.name} ({definition.id})")
         #     for call in definition.function_calls:
         #         print(f" - {call.callee_name}")
 
-        expected_calls = [
-            "React.useState",
-            "View",
-            "Text",
-            "TouchableOpacity",
-            "CustomButton",
-            "CustomButton2Fake",
-            "CustomButton3Fake",
-            "NewComponent",
-            "NEWButton",
-            "incrementCount",
-        ]
-
-        for definition in nested_definitions:
-            if definition.name == "HookTestComponent":
-                for call in definition.function_calls:
-                    assert call.callee_name in expected_calls, (
-                        f"Unexpected call: {call.callee_name}"
-                    )
-
-        if nested_definitions:
-            for definition in nested_definitions:
-                # Should have multiple calls representing nested elements
-
-                # All calls should have valid structure
-                for call in definition.function_calls:
-                    assert isinstance(call.callee_name, str)
-                    assert len(call.callee_name) > 0
+        hook_component = jsx_index.defs_by_name.get("HookTestComponent")
+        if hook_component is not None:
+            for call in hook_component.function_calls:
+                assert call.callee_name in EXPECTED_HOOK_TEST_CALLS, (
+                    f"Unexpected call: {call.callee_name}"
+                )
+
+        for definition in definitions:
+            # All calls should have valid structure
+            for call in definition.function_calls:
+                assert isinstance(call.callee_name, str)
+                assert call.callee_name
 
     @pytest.mark.asyncio
     async def test_handle_jsx_attributes(self, jsx_parse_result):
@@ -183,7 +153,7 @@ class TestJSXComponentParsing:
         definitions = parse_result.definitions
 
         # Should have extracted definitions successfully despite JSX attributes
-        assert len(definitions) > 0
+        assert definitions
 
         # All definitions should have valid line numbers
         for definition in definitions:
@@ -191,22 +161,16 @@ class TestJSXComponentParsing:
             assert definition.end_line >= definition.start_line
 
     @pytest.mark.asyncio
-    async def test_handle_event_handlers(self, jsx_parse_result):
+    async def test_handle_event_handlers(self, jsx_all_calls):
         """Test that event handlers in JSX are captured as function calls."""
-        parse_result = jsx_parse_result
-        definitions = parse_result.definitions
-
         # Look for function calls that might be event handlers
-        all_calls: list[FunctionCallModel] = []
-        for definition in definitions:
-            all_calls.extend(definition.function_calls)
+        all_calls: tuple[FunctionCallModel, ...] = jsx_all_calls
 
         # Event handlers might appear as function calls
-        if all_calls:
-            for call in all_calls:
-                # Basic structure validation
-                assert isinstance(call.callee_name, str)
-                assert call.callee_source in ["local", "imported", "unknown"]
+        for call in all_calls:
+            # Basic structure validation
+            assert isinstance(call.callee_name, str)
+            assert call.callee_source in VALID_SOURCES
 
     @pytest.mark.asyncio
     async def test_export_jsx_components(self, jsx_parse_result):
@@ -215,10 +179,9 @@ class TestJSXComponentParsing:
         exports = parse_result.exports
 
         # Should have some exports in a component file
-        if exports:
-            for export in exports:
-                assert isinstance(export, str)
-                assert len(export) > 0
+        for export in exports:
+            assert isinstance(export, str)
+            assert export
 
     @pytest.mark.asyncio
     async def test_typescript_in_jsx(self, jsx_parse_result):
@@ -233,7 +196,7 @@ class TestJSXComponentParsing:
 
             # Function calls should be properly resolved
             for call in definition.function_calls:
-                assert call.callee_source in ["local", "imported", "unknown"]
+                assert call.callee_source in VALID_SOURCES
                 if call.callee_source == "imported":
                     assert call.import_details is not None
 
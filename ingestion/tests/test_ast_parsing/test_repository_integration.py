@@ -1,21 +1,25 @@
 """Test repository integration with AST parsing."""
 
+from collections import defaultdict
+
 import pytest
+from sqlalchemy.orm import joinedload, selectinload
 from database.manager import DatabaseManager, session_scope
 from database.models import RepositoryModel, PackageModel, FileModel
 from ast_parsing.parser import parse_and_persist_repo
 
 
+@pytest.mark.xdist_group("repository_integration")
 class TestRepositoryIntegration:
     """Test repository information extraction and persistence."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def test_repo_path(self):
         """Placeholder for test repository path."""
         # TODO: Replace with actual test repository path
         return "/Users/sohan/Documents/trysita-onboard/analysis-agent-new/test-repos/merchie/"
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def expected_repo_info(self):
         """Expected repository information."""
         # TODO: Replace with actual expected values
@@ -25,16 +29,18 @@ class TestRepositoryIntegration:
             "default_branch": "main",
         }
 
+    @pytest.fixture(scope="class")
+    async def populated_db(self, test_repo_path: str, db_manager: DatabaseManager):
+        """Parse and persist the test repository once for every test in the class."""
+        await parse_and_persist_repo(test_repo_path, db_manager)
+        return db_manager
+
     @pytest.mark.asyncio
     async def test_repository_extraction_and_persistence(
-        self, test_repo_path: str, expected_repo_info: dict, db_manager: DatabaseManager
+        self, expected_repo_info: dict, populated_db: DatabaseManager
     ):
         """Test that repository information is correctly extracted and persisted."""
-
-        # Parse the repository
-        await parse_and_persist_repo(test_repo_path, db_manager)
-
-        with session_scope(db_manager) as session:
+        with session_scope(populated_db) as session:
             # Verify repository was created with correct information
             repository = (
                 session.query(RepositoryModel)
@@ -50,7 +56,10 @@ class TestRepositoryIntegration:
 
             # Verify packages are linked to repository
             packages = (
-                session.query(PackageModel).filter_by(repository_id=repository.id).all()
+                session.query(PackageModel)
+                .options(selectinload(PackageModel.files))
+                .filter_by(repository_id=repository.id)
+                .all()
             )
 
             assert len(packages) > 0, "Should have at least one package"
@@ -60,7 +69,13 @@ class TestRepositoryIntegration:
                 assert package.repository == repository
 
             # Verify files can access repository through packages
-            files = session.query(FileModel).all()
+            files = (
+                session.query(FileModel)
+                .options(
+                    joinedload(FileModel.package).joinedload(PackageModel.repository)
+                )
+                .all()
+            )
             assert len(files) > 0, "Should have parsed some files"
 
             # Test files that belong to packages in this repository
@@ -76,9 +91,12 @@ class TestRepositoryIntegration:
                     )
 
             # Test that packages contain their files
+            files_by_pkg: defaultdict[int | None, list[FileModel]] = defaultdict(list)
+            for file in files:
+                files_by_pkg[file.package_id].append(file)
+
             for package in packages:
-                # Get files that belong to this package
-                package_files = [f for f in files if f.package_id == package.id]
+                package_files = files_by_pkg[package.id]
                 # Test bidirectional relationship
                 assert len(package.files) == len(package_files), (
                     "Package.files should match files with package_id"
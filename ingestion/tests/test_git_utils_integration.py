@@ -13,27 +13,39 @@ Optional env to strengthen assertions:
 
 - TEST_GH_EXPECT_CHANGED_FILE: A path (repo-relative) expected to be in the diff
 - TEST_GH_EXPECT_ANY_CHANGE=1: Assert that at least one change exists
+- AUTODOCS_TEST_CACHE: Directory that keeps the clone between runs (defaults to
+  the system temp directory)
 
 Notes:
-- The helper currently shallow-clones/fetches branch "main".
+- The diff test keeps a bare repo; compare_commits_and_get_changed_files
+  shallow-fetches only the two commits it diffs.
+- The clone test shallow-clones branch "main" into a fresh directory, then
+  updates it in place, as the ingestion job does.
 - Set a non-empty `GITHUB_TOKEN` (dummy is fine) to enable callbacks; the
   credentials are resolved via the GitHub App and not this token value.
 """
 
 from __future__ import annotations
 
+import hashlib
 import os
 from pathlib import Path
+import tempfile
 
 import pytest
 import pygit2
 
 from ast_parsing.utils.git_utils import (
     GitChanges,
+    RepoInfo,
     compare_commits_and_get_changed_files,
     ensure_shallow_main,
 )
 
+REPO_URL = "https://github.com/TrySita/webapp"
+BEFORE_SHA = "058c6474bb339cb630678a30c263269ab6980da8"
+AFTER_SHA = "f6e99c8e01f39f0da76a704cf9654de0a52aea85"
+
 
 def _required_env() -> list[str]:
     return [
@@ -47,29 +59,60 @@ def _missing_env_vars() -> list[str]:
     return [k for k in _required_env() if not os.getenv(k)]
 
 
-@pytest.mark.skipif(
+requires_github_app = pytest.mark.skipif(
     bool(_missing_env_vars()),
     reason=("Missing required env for integration test: " + ", ".join(_required_env())),
 )
-def test_github_app_shallow_diff(tmp_path: Path) -> None:
-    repo_url = "https://github.com/TrySita/webapp"
-    before_sha = "058c6474bb339cb630678a30c263269ab6980da8"
-    after_sha = "f6e99c8e01f39f0da76a704cf9654de0a52aea85"
 
-    workdir = tmp_path / "repo"
-    workdir.mkdir(parents=True, exist_ok=True)
 
-    # Shallow clone main and ensure repo is usable on disk
-    _ = ensure_shallow_main(workdir.as_posix(), repo_url)
-    repo = pygit2.Repository(workdir.as_posix())
+@pytest.fixture(scope="session")
+def shallow_repo() -> Path:
+    """Bare repo with origin set to REPO_URL, cached across runs.
+
+    Commits are left for compare_commits_and_get_changed_files to fetch.
+    """
+    cache_root = Path(os.environ.get("AUTODOCS_TEST_CACHE", tempfile.gettempdir()))
+    repo_key = hashlib.sha1(REPO_URL.encode()).hexdigest()[:12]
+    workdir = cache_root / "autodocs" / f"{repo_key}.git"
+    workdir.parent.mkdir(parents=True, exist_ok=True)
+
+    # The diff only reads commits and trees, so skip cloning main and its checkout
+    if not (workdir / "HEAD").exists():
+        repo = pygit2.init_repository(workdir.as_posix(), bare=True)
+        _ = repo.remotes.create("origin", REPO_URL)
+    return workdir
+
+
+@requires_github_app
+def test_ensure_shallow_main(tmp_path: Path) -> None:
+    repo_path = (tmp_path / "clone").as_posix()
+
+    # First call shallow-clones main and checks it out
+    cloned: RepoInfo = ensure_shallow_main(repo_path, REPO_URL)
+    repo = pygit2.Repository(repo_path)
+    assert repo.is_shallow
+    assert not repo.is_bare
+    assert cloned.commit_hash == str(repo.head.target)
+    assert cloned.default_branch == "main"
+
+    # Second call takes the existing-repo path and shallow-fetches main again
+    updated: RepoInfo = ensure_shallow_main(repo_path, REPO_URL)
+    assert updated.commit_hash is not None
+    assert updated.default_branch == cloned.default_branch
+
+
+@requires_github_app
+def test_github_app_shallow_diff(shallow_repo: Path) -> None:
+    # The cached repo should be usable on disk
+    repo = pygit2.Repository(shallow_repo.as_posix())
     assert repo is not None
 
-    # Compute file-level diff between two commits using shallow fetches
+    # Fetches both commits shallowly, then computes the file-level diff
     changes: GitChanges = compare_commits_and_get_changed_files(
-        before_commit_hash=before_sha,
-        after_commit_hash=after_sha,
-        repo_path=workdir.as_posix(),
-        remote_origin_url=repo_url,
+        before_commit_hash=BEFORE_SHA,
+        after_commit_hash=AFTER_SHA,
+        repo_path=shallow_repo.as_posix(),
+        remote_origin_url=REPO_URL,
         detect_renames=True,
     )
 
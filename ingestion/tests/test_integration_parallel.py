@@ -1,9 +1,13 @@
 """Integration test for parallel summary generation using real repository."""
 
+from contextlib import closing
 import os
 from pathlib import Path
+import sqlite3
+import sys
 
 import pytest
+from sqlalchemy.orm import joinedload, selectinload
 
 from database.manager import DatabaseManager
 from ast_parsing.parser import parse_and_persist_repo
@@ -20,7 +24,7 @@ from database.models import (
 class TestParallelIntegration:
     """Integration tests for parallel processing on real repositories."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def merchie_repo_path(self):
         """Path to the merchie test repository."""
         current_dir = Path(__file__).parent.parent
@@ -31,21 +35,36 @@ class TestParallelIntegration:
             pytest.skip(f"Merchie test repository not found at {repo_path}")
         return str(repo_path)
 
+    @pytest.fixture(scope="class")
+    async def parsed_merchie_db(self, merchie_repo_path, tmp_path_factory):
+        """Parse the merchie repository once into a master database file."""
+        master_path = tmp_path_factory.mktemp("merchie") / "master.db"
+        db_manager = DatabaseManager(db_path=str(master_path), expire_on_commit=False)
+        await parse_and_persist_repo(merchie_repo_path, db_manager=db_manager)
+        # Disposing the engine checkpoints the WAL before tests restore from it
+        db_manager.close()
+        return master_path
+
     @pytest.fixture
-    def temp_db_path(self, tmp_path):
-        """Temporary database path for integration test."""
-        return str(tmp_path / "test_integration.db")
+    def merchie_db(self, parsed_merchie_db):
+        """Fresh in-memory copy of the parsed merchie database for one test."""
+        db_manager = DatabaseManager(db_path=":memory:", expire_on_commit=False)
+        # The in-memory engine has a single StaticPool connection to restore into
+        raw_connection = db_manager.engine.raw_connection()
+        with closing(sqlite3.connect(parsed_merchie_db)) as master:
+            master.backup(raw_connection.driver_connection)
+        raw_connection.close()
+        yield db_manager
+        db_manager.close()
 
     @pytest.mark.asyncio
     async def test_merchie_parallel_processing_levels(
-        self, merchie_repo_path, temp_db_path
+        self, merchie_repo_path, merchie_db
     ):
         """Test parallel processing levels on the merchie repository."""
         print(f"\\n📂 Testing parallel processing on: {merchie_repo_path}")
 
-        # Parse the repository
-        db_manager = DatabaseManager(db_path=temp_db_path, expire_on_commit=False)
-        await parse_and_persist_repo(merchie_repo_path, db_manager=db_manager)
+        db_manager = merchie_db
 
         with db_manager.get_session() as session:
             print(f"✅ Parsed repository:")
@@ -69,24 +88,41 @@ class TestParallelIntegration:
             executor.compute_batched_traversal_order(definition_graph)
         )
 
-        os.system("clear")
+        # Opt-in screen clear for interactive runs, without spawning a shell
+        if sys.stdout.isatty() and os.environ.get("AUTODOCS_CLEAR"):
+            print("\033[2J\033[H", end="")
 
         print(f"\\n📊 Computed {len(definition_levels)} definition processing levels:")
 
         # Display definition levels with actual names for manual verification
         with db_manager.get_session() as session:
+            # Fetch the listed definitions with their file and references at once
+            shown_ids = {
+                def_id
+                for level in definition_levels
+                for def_id_set in level[:10]
+                for def_id in def_id_set
+            }
+            definitions_by_id: dict[int, DefinitionModel] = {
+                definition.id: definition
+                for definition in session.query(DefinitionModel)
+                .filter(DefinitionModel.id.in_(list(shown_ids)))
+                .options(
+                    joinedload(DefinitionModel.file),
+                    selectinload(DefinitionModel.references),
+                )
+            }
+
             total_definitions = 0
+            # Collect the level listing and write it out in one go
+            lines: list[str] = []
             for i, level in enumerate(definition_levels):
-                print(f"\\n  📋 Level {i} ({len(level)} definitions):")
+                lines.append(f"\\n  📋 Level {i} ({len(level)} definitions):")
                 level_definitions = []
 
                 for def_id_set in level[:10]:  # Show first 10 to avoid too much output
                     for def_id in def_id_set:
-                        definition = (
-                            session.query(DefinitionModel)
-                            .filter(DefinitionModel.id == def_id)
-                            .first()
-                        )
+                        definition = definitions_by_id.get(def_id)
                         if definition:
                             level_definitions.append(
                                 {
@@ -104,16 +140,19 @@ class TestParallelIntegration:
                                 }
                             )
 
-                # Print definitions in this level
+                # List definitions in this level
                 for def_info in level_definitions:
-                    print(
+                    lines.append(
                         f"    - {def_info['type']} '{def_info['name']}' in {def_info['file']}\n"
                     )
-                    print("Level:", i, "\n")
-                    print("Referneces:", def_info["references"], "\n")
+                    lines.append(f"Level: {i} \n")
+                    lines.append(f"Referneces: {def_info['references']} \n")
 
                 total_definitions += len(level)
 
+            _ = sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
             print(f"\\n📈 Summary:")
             print(f"   - Total definitions: {total_definitions}")
             print(f"   - Processing levels: {len(definition_levels)}")
@@ -123,35 +162,33 @@ class TestParallelIntegration:
 
             # Show some dependency examples for manual verification
             print(f"\\n🔍 Dependency examples (for manual verification):")
+            # Only names and file names are needed, so stream plain rows
+            edge_labels: dict[int, tuple[str, str]] = {
+                row.id: (
+                    row.name,
+                    row.file_path.split("/")[-1] if row.file_path else "unknown",
+                )
+                for row in session.query(
+                    DefinitionModel.id, DefinitionModel.name, FileModel.file_path
+                )
+                .outerjoin(DefinitionModel.file)
+                .filter(DefinitionModel.id.in_(list(definition_graph.nodes)))
+                .yield_per(1000)
+            }
+
             edges_shown = 0
             for source, target in definition_graph.edges():
                 if edges_shown >= 10:  # Show first 10 edges
                     break
 
-                source_def = (
-                    session.query(DefinitionModel)
-                    .filter(DefinitionModel.id == source)
-                    .first()
-                )
-                target_def = (
-                    session.query(DefinitionModel)
-                    .filter(DefinitionModel.id == target)
-                    .first()
-                )
+                source_label = edge_labels.get(source)
+                target_label = edge_labels.get(target)
 
-                if source_def and target_def:
-                    source_file = (
-                        source_def.file.file_path.split("/")[-1]
-                        if source_def.file
-                        else "unknown"
-                    )
-                    target_file = (
-                        target_def.file.file_path.split("/")[-1]
-                        if target_def.file
-                        else "unknown"
-                    )
+                if source_label and target_label:
+                    source_name, source_file = source_label
+                    target_name, target_file = target_label
                     print(
-                        f"   - {source_def.name} ({source_file}) → {target_def.name} ({target_file})"
+                        f"   - {source_name} ({source_file}) → {target_name} ({target_file})"
                     )
                     edges_shown += 1
 
@@ -171,6 +208,12 @@ class TestParallelIntegration:
         print(f"\\n📁 File processing levels: {len(file_levels)}")
 
         with db_manager.get_session() as session:
+            file_paths: dict[int, str] = dict(
+                session.query(FileModel.id, FileModel.file_path)
+                .filter(FileModel.id.in_(list(file_graph.nodes)))
+                .all()
+            )
+
             for i, level in enumerate(file_levels):
                 # if i >= 5:  # Show first 5 levels to avoid too much output
                 #     print(f"   ... and {len(file_levels) - 5} more levels")
@@ -179,14 +222,10 @@ class TestParallelIntegration:
                 print(f"\\n  📋 File Level {i} ({len(level)} files):")
                 for file_id_set in level:  # Show first 5 files per level
                     for file_id in file_id_set:
-                        file_model = (
-                            session.query(FileModel)
-                            .filter(FileModel.id == file_id)
-                            .first()
-                        )
-                        if file_model:
-                            relative_path = file_model.file_path.replace(
-                                merchie_repo_path, ""
+                        file_path = file_paths.get(file_id)
+                        if file_path:
+                            relative_path = file_path.removeprefix(
+                                merchie_repo_path
                             ).lstrip("/")
                             print(f"    - {relative_path}")
 
@@ -2,20 +2,59 @@
 
 # Add src to path to avoid circular import issues
 
+import os
+from pathlib import Path
+import shutil
+
+import pytest
+
 from ast_parsing.utils.package_registry import PackageRegistry
 
+REPOS_ROOT = Path(
+    os.environ.get("AUTODOCS_TS_FIXTURES", Path(__file__).parent / "typescript-repos")
+)
+
+
+def _repo_path(name: str) -> Path:
+    repo_path = REPOS_ROOT / name
+    if not repo_path.is_dir():
+        pytest.skip(f"TypeScript fixture repository not found at {repo_path}")
+    return repo_path
+
+
+@pytest.fixture(scope="class")
+def registry(
+    request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory
+) -> PackageRegistry:
+    """Registry built once per class and repo, over a private copy of the repo.
+
+    Constructing a PackageRegistry runs the monorepo setup, which can write
+    tsconfig.json and node_modules symlinks, so the checked-in repo is never used.
+    """
+    repo_path = shutil.copytree(
+        _repo_path(request.param),
+        tmp_path_factory.mktemp("registry") / request.param,
+        symlinks=True,
+    )
+    return PackageRegistry(str(repo_path))
+
+
+@pytest.fixture
+def repo_copy(request: pytest.FixtureRequest, tmp_path: Path) -> str:
+    """Private copy of a fixture repo for tests that write into it."""
+    return str(
+        shutil.copytree(
+            _repo_path(request.param), tmp_path / request.param, symlinks=True
+        )
+    )
+
 
 class TestMonorepoConfigurations:
     """Test monorepo configuration detection and setup."""
 
-    def test_pnpm_workspace_detection(self):
+    @pytest.mark.parametrize("registry", ["pnpm-workspace-repo"], indirect=True)
+    def test_pnpm_workspace_detection(self, registry: PackageRegistry):
         """Test that pnpm workspaces are correctly detected and configured."""
-        # Use the test repository we created
-        test_repo_path = "/Users/sohan/Documents/trysita-onboard/analysis-agent-new/tests/typescript-repos/pnpm-workspace-repo"
-
-        # Initialize PackageRegistry
-        registry = PackageRegistry(test_repo_path)
-
         # Verify workspace metadata is detected
         assert registry.workspace_metadata is not None
         assert registry.workspace_metadata.type == "pnpm"
@@ -58,12 +97,9 @@ class TestMonorepoConfigurations:
         assert ui_package.entry_point is not None
         assert ui_package.entry_point.endswith("src/index.ts")
 
-    def test_yarn_workspace_detection(self):
+    @pytest.mark.parametrize("registry", ["yarn-workspace-repo"], indirect=True)
+    def test_yarn_workspace_detection(self, registry: PackageRegistry):
         """Test that yarn workspaces are correctly detected and configured."""
-        test_repo_path = "/Users/sohan/Documents/trysita-onboard/analysis-agent-new/tests/typescript-repos/yarn-workspace-repo"
-
-        registry = PackageRegistry(test_repo_path)
-
         # Verify workspace metadata is detected
         assert registry.workspace_metadata is not None
         assert registry.workspace_metadata.type == "yarn"
@@ -97,19 +133,15 @@ class TestMonorepoConfigurations:
         assert web_package is not None
         assert "@company/shared" in web_package.dependencies
 
-    def test_direct_imports_monorepo(self):
+    # Rewrites tsconfig.json, so it runs against a private copy of the repo
+    @pytest.mark.parametrize("repo_copy", ["direct-imports-repo"], indirect=True)
+    def test_direct_imports_monorepo(self, repo_copy: str):
         """Test that direct import monorepos are correctly detected and configured."""
-        test_repo_path = "/Users/sohan/Documents/trysita-onboard/analysis-agent-new/tests/typescript-repos/direct-imports-repo"
+        test_repo_path = repo_copy
 
-        # Store original tsconfig for cleanup
-        import json
         import os
 
         tsconfig_path = os.path.join(test_repo_path, "tsconfig.json")
-        original_tsconfig = None
-        if os.path.exists(tsconfig_path):
-            with open(tsconfig_path, "r") as f:
-                original_tsconfig = json.load(f)
 
         registry = PackageRegistry(test_repo_path)
 
@@ -145,37 +177,24 @@ class TestMonorepoConfigurations:
         # Verify tsconfig.json was extended with references
         assert os.path.exists(tsconfig_path)
 
-        with open(tsconfig_path, "r") as f:
-            tsconfig = json.load(f)
-
+        tsconfig = registry.monorepo_setup_info.tsconfig
+        assert tsconfig is not None
         assert "references" in tsconfig
         references = tsconfig["references"]
         reference_paths = {ref["path"] for ref in references}
         assert "core" in reference_paths
         assert "api" in reference_paths
 
-        # Cleanup: Restore original tsconfig
-        if original_tsconfig is not None:
-            with open(tsconfig_path, "w") as f:
-                json.dump(original_tsconfig, f, indent=2)
-        else:
-            os.remove(tsconfig_path)
-
-    def test_package_based_monorepo(self):
+    # Writes tsconfig.json and node_modules symlinks, so it runs against a copy
+    @pytest.mark.parametrize("repo_copy", ["package-based-repo"], indirect=True)
+    def test_package_based_monorepo(self, repo_copy: str):
         """Test that package-based monorepos are correctly detected and configured."""
-        test_repo_path = "/Users/sohan/Documents/trysita-onboard/analysis-agent-new/tests/typescript-repos/package-based-repo"
+        test_repo_path = repo_copy
 
-        # Store original tsconfig for cleanup
-        import json
         import os
-        import shutil
 
         tsconfig_path = os.path.join(test_repo_path, "tsconfig.json")
         node_modules_path = os.path.join(test_repo_path, "node_modules")
-        original_tsconfig = None
-        if os.path.exists(tsconfig_path):
-            with open(tsconfig_path, "r") as f:
-                original_tsconfig = json.load(f)
 
         registry = PackageRegistry(test_repo_path)
 
@@ -216,9 +235,8 @@ class TestMonorepoConfigurations:
         # Verify synthetic tsconfig.json was created at root
         assert os.path.exists(tsconfig_path)
 
-        with open(tsconfig_path, "r") as f:
-            tsconfig = json.load(f)
-
+        tsconfig = registry.monorepo_setup_info.tsconfig
+        assert tsconfig is not None
         assert "references" in tsconfig
         references = tsconfig["references"]
         reference_paths = {ref["path"] for ref in references}
@@ -246,14 +264,3 @@ class TestMonorepoConfigurations:
             expected_target = os.path.join(test_repo_path, "user-service")
             actual_target = os.readlink(user_service_symlink)
             assert os.path.samefile(actual_target, expected_target)
-
-        # Cleanup: Restore original state
-        if original_tsconfig is not None:
-            with open(tsconfig_path, "w") as f:
-                json.dump(original_tsconfig, f, indent=2)
-        else:
-            if os.path.exists(tsconfig_path):
-                os.remove(tsconfig_path)
-
-        if os.path.exists(node_modules_path):
-            shutil.rmtree(node_modules_path)
@@ -3,599 +3,460 @@ Unit tests for enhanced PackageRegistry functionality.
 
 Tests cover internal package dependency detection, path mapping generation,
 and tsconfig consolidation for various monorepo configurations and edge cases.
+
+Every test builds its repository under pytest's per-worker tmp directories and
+shares no state, so the module needs no xdist_group and is safe under -n auto.
 """
 
+from dataclasses import dataclass, field
+from functools import cached_property
 import json
-import os
-import tempfile
 from pathlib import Path
-from typing import Any
+import shutil
+from typing import Any, Callable
 from unittest.mock import patch
 
+import orjson
 import pytest
 
-from ast_parsing.utils.package_registry import PackageRegistry, PackageInfo
-from ast_parsing.utils.package_discovery import PackageJsonInfo, WorkspaceMetadata
+from ast_parsing.utils.package_registry import PackageRegistry
 
 
-class TestPackageRegistryEnhanced:
-    """Test enhanced PackageRegistry functionality for monorepo support."""
+def _dumps(data: dict[str, Any]) -> str:
+    """Serialize a fixture package.json compactly."""
+    return orjson.dumps(data).decode()
 
-    def create_temp_repo(self, structure: dict[str, Any]) -> str:
-        """Create a temporary repository structure for testing."""
-        temp_dir = tempfile.mkdtemp()
-        
-        def create_structure(base_path: str, structure: dict):
-            for name, content in structure.items():
-                path = os.path.join(base_path, name)
-                if isinstance(content, dict):
-                    os.makedirs(path, exist_ok=True)
-                    create_structure(path, content)
-                else:
-                    os.makedirs(os.path.dirname(path), exist_ok=True)
-                    with open(path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-        
-        create_structure(temp_dir, structure)
-        return temp_dir
-
-    def test_internal_package_dependencies_pnpm_workspace_protocol(self):
-        """Test detection of internal dependencies with pnpm workspace: protocol."""
-        # Create a mock repo with pnpm workspace dependencies
-        structure = {
-            'package.json': json.dumps({
-                "name": "monorepo",
-                "private": True,
-                "workspaces": ["packages/*"]
-            }),
-            'pnpm-workspace.yaml': 'packages:\n  - "packages/*"',
-            'packages': {
-                'core': {
-                    'package.json': json.dumps({
-                        "name": "@repo/core",
-                        "dependencies": {
-                            "@repo/utils": "workspace:*",
-                            "external-lib": "^1.0.0"
-                        }
-                    }),
-                    'src': {
-                        'index.ts': 'export const core = "core";'
-                    }
-                },
-                'utils': {
-                    'package.json': json.dumps({
-                        "name": "@repo/utils",
-                        "dependencies": {
-                            "lodash": "^4.0.0"
-                        }
-                    }),
-                    'src': {
-                        'index.ts': 'export const utils = "utils";'
-                    }
-                },
-                'ui': {
-                    'package.json': json.dumps({
-                        "name": "@repo/ui",
-                        "dependencies": {
-                            "@repo/core": "workspace:^1.0.0",
-                            "@repo/utils": "workspace:*",
-                            "react": "^18.0.0"
-                        }
-                    }),
-                    'src': {
-                        'index.ts': 'export const ui = "ui";'
-                    }
-                }
-            }
-        }
-        
-        temp_repo = self.create_temp_repo(structure)
-        
-        try:
-            registry = PackageRegistry(temp_repo)
-            internal_deps = registry.get_internal_package_dependencies()
-            
-            # Check that internal dependencies are detected correctly
-            assert "@repo/core" in internal_deps
-            assert "@repo/utils" in internal_deps["@repo/core"]
-            assert "external-lib" not in internal_deps["@repo/core"]
-            
-            assert "@repo/ui" in internal_deps
-            expected_ui_deps = {"@repo/core", "@repo/utils"}
-            assert internal_deps["@repo/ui"] == expected_ui_deps
-            
-            # utils should not have internal deps
-            assert "@repo/utils" not in internal_deps
-            
-        finally:
-            # Clean up
-            import shutil
-            shutil.rmtree(temp_repo)
-
-    def test_internal_package_dependencies_npm_star_protocol(self):
-        """Test detection of internal dependencies with npm * protocol."""
-        structure = {
-            'package.json': json.dumps({
-                "name": "monorepo",
-                "private": True,
-                "workspaces": ["packages/*"]
-            }),
-            'packages': {
-                'core': {
-                    'package.json': json.dumps({
-                        "name": "@repo/core",
-                        "dependencies": {
-                            "@repo/utils": "*",
-                            "external-lib": "^1.0.0"
-                        }
-                    }),
-                    'src': {
-                        'index.ts': 'export const core = "core";'
-                    }
-                },
-                'utils': {
-                    'package.json': json.dumps({
-                        "name": "@repo/utils",
-                        "dependencies": {
-                            "lodash": "*"  # This should NOT be detected as internal
-                        }
-                    }),
-                    'src': {
-                        'index.ts': 'export const utils = "utils";'
-                    }
-                }
-            }
-        }
-        
-        temp_repo = self.create_temp_repo(structure)
-        
-        try:
-            registry = PackageRegistry(temp_repo)
-            internal_deps = registry.get_internal_package_dependencies()
-            
-            # Check that internal dependencies are detected correctly
-            assert "@repo/core" in internal_deps
-            assert "@repo/utils" in internal_deps["@repo/core"]
-            assert "external-lib" not in internal_deps["@repo/core"]
-            
-            # lodash is not an internal package, so should not be detected
-            assert "@repo/utils" not in internal_deps
-            
-        finally:
-            import shutil
-            shutil.rmtree(temp_repo)
-
-    def test_path_mappings_generation(self):
-        """Test generation of TypeScript path mappings for internal packages."""
-        structure = {
-            'package.json': json.dumps({
-                "name": "monorepo",
-                "private": True,
-                "workspaces": ["packages/*"]
-            }),
-            'packages': {
-                'core': {
-                    'package.json': json.dumps({
-                        "name": "@repo/core",
-                        "main": "./dist/index.js",
-                        "types": "./dist/index.d.ts"
-                    }),
-                    'src': {
-                        'index.ts': 'export const core = "core";'
-                    }
-                },
-                'utils': {
-                    'package.json': json.dumps({
-                        "name": "@repo/utils"
-                    }),
-                    'index.ts': 'export const utils = "utils";'  # No src dir
-                }
-            }
+
+@dataclass(frozen=True)
+class RepoPackage:
+    """A workspace package under packages/<directory> with one TypeScript file."""
+
+    name: str
+    directory: str
+    dependencies: dict[str, str] = field(default_factory=dict)
+    main: str | None = None
+    exports: dict[str, Any] | None = None
+    source_path: str = 'src/index.ts'
+
+    @cached_property
+    def package_json(self) -> str:
+        data: dict[str, Any] = {"name": self.name}
+        if self.main is not None:
+            data["main"] = self.main
+        if self.exports is not None:
+            data["exports"] = self.exports
+        if self.dependencies:
+            data["dependencies"] = self.dependencies
+        return _dumps(data)
+
+    def structure(self) -> dict[str, Any]:
+        tree: dict[str, Any] = {'package.json': self.package_json}
+        *directories, filename = self.source_path.split('/')
+        node = tree
+        for directory in directories:
+            node = node.setdefault(directory, {})
+        node[filename] = f'export const name = "{self.name}";'
+        return tree
+
+
+@dataclass(frozen=True)
+class RepoSpec:
+    """A packages/* monorepo with extra files at its root."""
+
+    packages: list[RepoPackage]
+    root_files: dict[str, str] = field(default_factory=dict)
+
+    @cached_property
+    def structure(self) -> dict[str, Any]:
+        return {
+            'package.json': ROOT_MONOREPO_PACKAGE_JSON,
+            **self.root_files,
+            'packages': {pkg.directory: pkg.structure() for pkg in self.packages},
         }
-        
-        temp_repo = self.create_temp_repo(structure)
-        
-        try:
-            registry = PackageRegistry(temp_repo)
-            path_mappings = registry.generate_path_mappings_for_internal_packages()
-            
-            # Check that path mappings point to package directories
-            assert "@repo/core" in path_mappings
-            assert path_mappings["@repo/core"] == ["packages/core"]
-            
-            assert "@repo/core/*" in path_mappings
-            assert path_mappings["@repo/core/*"] == ["packages/core/*"]
-            
-            # utils package mapping
-            assert "@repo/utils" in path_mappings
-            assert path_mappings["@repo/utils"] == ["packages/utils"]
-            
-            assert "@repo/utils/*" in path_mappings
-            assert path_mappings["@repo/utils/*"] == ["packages/utils/*"]
-            
-        finally:
-            import shutil
-            shutil.rmtree(temp_repo)
-
-    def test_consolidate_tsconfig_with_path_mappings(self):
-        """Test tsconfig consolidation includes path mappings."""
-        structure = {
-            'package.json': json.dumps({
-                "name": "monorepo",
-                "private": True,
-                "workspaces": ["packages/*"]
-            }),
-            'packages': {
-                'core': {
-                    'package.json': json.dumps({
-                        "name": "@repo/core",
-                        "dependencies": {
-                            "@repo/utils": "workspace:*"
-                        }
-                    }),
-                    'src': {
-                        'index.ts': 'import { utils } from "@repo/utils"; export const core = utils;'
-                    }
-                },
-                'utils': {
-                    'package.json': json.dumps({
-                        "name": "@repo/utils"
-                    }),
-                    'src': {
-                        'index.ts': 'export const utils = "utils";'
-                    }
-                }
+
+    def materialize(self, base_path: Path) -> Path:
+        create_structure(base_path, self.structure)
+        return base_path
+
+
+# Root package.json shared by every monorepo below
+ROOT_MONOREPO_PACKAGE_JSON = _dumps({
+    "name": "monorepo",
+    "private": True,
+    "workspaces": ["packages/*"]
+})
+
+# Pnpm monorepo where core depends on utils and ui depends on both
+PNPM_CORE_UTILS_REPO = RepoSpec(
+    packages=[
+        RepoPackage(
+            "@repo/core",
+            "core",
+            {"@repo/utils": "workspace:*", "external-lib": "^1.0.0"},
+        ),
+        RepoPackage("@repo/utils", "utils", {"lodash": "^4.0.0"}),
+        RepoPackage(
+            "@repo/ui",
+            "ui",
+            {
+                "@repo/core": "workspace:^1.0.0",
+                "@repo/utils": "workspace:*",
+                "react": "^18.0.0",
+            },
+        ),
+    ],
+    root_files={'pnpm-workspace.yaml': 'packages:\n  - "packages/*"'},
+)
+
+# Monorepo whose internal dependencies use the npm "*" protocol
+NPM_STAR_REPO = RepoSpec(
+    packages=[
+        RepoPackage(
+            "@repo/core", "core", {"@repo/utils": "*", "external-lib": "^1.0.0"}
+        ),
+        # lodash is "*" too, but should NOT be detected as internal
+        RepoPackage("@repo/utils", "utils", {"lodash": "*"}),
+    ],
+)
+
+# Monorepo mixing workspace:, "*" and external dependencies
+MIXED_PROTOCOLS_REPO = RepoSpec(
+    packages=[
+        RepoPackage(
+            "@repo/mixed",
+            "mixed",
+            {
+                "@repo/workspace-dep": "workspace:*",
+                "@repo/npm-dep": "*",
+                "external": "^1.0.0",
+                "@repo/nonexistent": "*",  # This package doesn't exist
+            },
+        ),
+        RepoPackage("@repo/workspace-dep", "workspace-dep"),
+        RepoPackage("@repo/npm-dep", "npm-dep"),
+    ],
+)
+
+# Two-package monorepo that already has a root tsconfig.json
+EXISTING_TSCONFIG_REPO = RepoSpec(
+    packages=[
+        RepoPackage("@repo/core", "core"),
+        RepoPackage("@repo/utils", "utils"),
+    ],
+    root_files={
+        'tsconfig.json': _dumps({
+            "compilerOptions": {
+                "strict": True,
+                "target": "ES2020"
             }
-        }
-        
-        temp_repo = self.create_temp_repo(structure)
-        
-        try:
-            registry = PackageRegistry(temp_repo)
-            result = registry.consolidate_tsconfig_for_monorepo()
-            
-            assert result is True
-            
-            # Check that tsconfig.json was created
-            tsconfig_path = os.path.join(temp_repo, 'tsconfig.json')
-            assert os.path.exists(tsconfig_path)
-            
-            # Read and verify the generated config
-            with open(tsconfig_path, 'r') as f:
-                config = json.load(f)
-            
-            # Check basic structure
-            assert "compilerOptions" in config
-            assert "baseUrl" in config["compilerOptions"]
-            assert config["compilerOptions"]["baseUrl"] == "."
-            
-            # Check that path mappings were included
-            assert "paths" in config["compilerOptions"]
-            paths = config["compilerOptions"]["paths"]
-            
-            assert "@repo/core" in paths
-            assert "@repo/utils" in paths
-            assert "@repo/core/*" in paths
-            assert "@repo/utils/*" in paths
-            
-            # Check include patterns
-            assert "include" in config
-            assert len(config["include"]) > 0
-            
-        finally:
-            import shutil
-            shutil.rmtree(temp_repo)
-
-    def test_consolidate_tsconfig_preserves_existing_config(self):
-        """Test that existing tsconfig is backed up and extended."""
-        structure = {
-            'package.json': json.dumps({
-                "name": "monorepo",
-                "private": True,
-                "workspaces": ["packages/*"]
-            }),
-            'tsconfig.json': json.dumps({
-                "compilerOptions": {
-                    "strict": True,
-                    "target": "ES2020"
+        }),
+    },
+)
+
+# Plain single-package repository
+SINGLE_PACKAGE_STRUCTURE = {
+    'package.json': _dumps({
+        "name": "single-package",
+        "private": True
+    }),
+    'src': {
+        'index.ts': 'export const app = "app";'
+    }
+}
+
+# Scoped package depending on an unscoped and another scoped package
+SCOPED_UNSCOPED_REPO = RepoSpec(
+    packages=[
+        RepoPackage(
+            "@org/scoped",
+            "scoped",
+            {"unscoped": "workspace:*", "@org/another": "workspace:*"},
+        ),
+        RepoPackage("unscoped", "unscoped"),
+        RepoPackage("@org/another", "another"),
+    ],
+)
+
+# Packages declaring their entry via "main", "exports", or neither
+ENTRY_POINTS_REPO = RepoSpec(
+    packages=[
+        RepoPackage(
+            "@repo/with-main",
+            "with-main",
+            main="./lib/custom.js",
+            source_path='lib/custom.ts',
+        ),
+        RepoPackage(
+            "@repo/with-exports",
+            "with-exports",
+            exports={".": "./dist/index.js"},
+            source_path='dist/index.ts',
+        ),
+        RepoPackage("@repo/default", "default-structure"),
+    ],
+)
+
+# Valid package depending on a package whose package.json is malformed
+MALFORMED_PACKAGE_JSON_STRUCTURE = {
+    'package.json': ROOT_MONOREPO_PACKAGE_JSON,
+    'packages': {
+        'valid': {
+            'package.json': _dumps({
+                "name": "@repo/valid",
+                "dependencies": {
+                    "@repo/invalid": "workspace:*"
                 }
             }),
-            'packages': {
-                'core': {
-                    'package.json': json.dumps({
-                        "name": "@repo/core"
-                    }),
-                    'src': {
-                        'index.ts': 'export const core = "core";'
-                    }
-                },
-                'utils': {
-                    'package.json': json.dumps({
-                        "name": "@repo/utils"
-                    }),
-                    'src': {
-                        'index.ts': 'export const utils = "utils";'
-                    }
-                }
+            'src': {
+                'index.ts': 'export const valid = "valid";'
             }
-        }
-        
-        temp_repo = self.create_temp_repo(structure)
-        
-        try:
-            registry = PackageRegistry(temp_repo)
-            result = registry.consolidate_tsconfig_for_monorepo()
-            
-            assert result is True
-            
-            # Check that backup was created
-            backup_path = os.path.join(temp_repo, 'tsconfig.prev.json')
-            assert os.path.exists(backup_path)
-            
-            # Check that new config extends the backup
-            tsconfig_path = os.path.join(temp_repo, 'tsconfig.json')
-            with open(tsconfig_path, 'r') as f:
-                config = json.load(f)
-            
-            assert "extends" in config
-            assert config["extends"] == "./tsconfig.prev.json"
-            
-        finally:
-            import shutil
-            shutil.rmtree(temp_repo)
-
-    def test_single_package_repo_skips_consolidation(self):
-        """Test that single-package repos skip consolidation."""
-        structure = {
-            'package.json': json.dumps({
-                "name": "single-package",
-                "private": True
-            }),
+        },
+        'invalid': {
+            'package.json': b'{ "name": "@repo/invalid", malformed json',  # Invalid JSON
             'src': {
-                'index.ts': 'export const app = "app";'
+                'index.ts': 'export const invalid = "invalid";'
             }
         }
-        
-        temp_repo = self.create_temp_repo(structure)
-        
-        try:
-            registry = PackageRegistry(temp_repo)
-            result = registry.consolidate_tsconfig_for_monorepo()
-            
-            # Should skip consolidation for single package
-            assert result is False
-            
-        finally:
-            import shutil
-            shutil.rmtree(temp_repo)
-
-    def test_mixed_dependency_protocols(self):
-        """Test handling of mixed workspace and npm dependency protocols."""
-        structure = {
-            'package.json': json.dumps({
-                "name": "monorepo",
-                "private": True,
-                "workspaces": ["packages/*"]
-            }),
-            'packages': {
-                'mixed': {
-                    'package.json': json.dumps({
-                        "name": "@repo/mixed",
-                        "dependencies": {
-                            "@repo/workspace-dep": "workspace:*",
-                            "@repo/npm-dep": "*",
-                            "external": "^1.0.0",
-                            "@repo/nonexistent": "*"  # This package doesn't exist
-                        }
-                    }),
-                    'src': {
-                        'index.ts': 'export const mixed = "mixed";'
-                    }
-                },
-                'workspace-dep': {
-                    'package.json': json.dumps({
-                        "name": "@repo/workspace-dep"
-                    }),
-                    'src': {
-                        'index.ts': 'export const workspaceDep = "workspaceDep";'
-                    }
+    }
+}
+
+
+def create_structure(base_path: Path, structure: dict):
+    """Write a nested {name: content-or-subdir} dict under base_path.
+
+    Content is either text, written as UTF-8, or bytes written verbatim.
+    """
+    for name, content in structure.items():
+        path = base_path / name
+        if isinstance(content, dict):
+            # Parents are created on the way down, so leaves never need mkdir
+            path.mkdir(exist_ok=True)
+            create_structure(path, content)
+        elif isinstance(content, bytes):
+            _ = path.write_bytes(content)
+        else:
+            _ = path.write_text(content, encoding='utf-8')
+
+
+@pytest.fixture
+def repo_builder(tmp_path: Path) -> Callable[[RepoSpec | dict[str, Any]], Path]:
+    """Return a builder that writes a repository structure into tmp_path."""
+
+    def build(repo: RepoSpec | dict[str, Any]) -> Path:
+        if isinstance(repo, RepoSpec):
+            return repo.materialize(tmp_path)
+        create_structure(tmp_path, repo)
+        return tmp_path
+
+    return build
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_package_registry(tmp_path_factory: pytest.TempPathFactory) -> None:
+    """Pay the registry's lazy imports (yaml for pnpm workspaces) up front."""
+    warmup = tmp_path_factory.mktemp("warmup")
+    create_structure(warmup, {
+        'package.json': _dumps({"name": "warmup"}),
+        'pnpm-workspace.yaml': 'packages: []',
+    })
+    _ = PackageRegistry(str(warmup))
+
+
+@pytest.fixture(scope="session")
+def pnpm_core_utils_repo(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Pristine pnpm monorepo, built once per session and only ever copied.
+
+    Constructing a PackageRegistry writes tsconfig.json and node_modules
+    symlinks into its repo, so tests take copy_of_pnpm_repo instead.
+    """
+    repo_path = tmp_path_factory.mktemp("pnpm_repo", numbered=False)
+    return PNPM_CORE_UTILS_REPO.materialize(repo_path)
+
+
+@pytest.fixture
+def copy_of_pnpm_repo(pnpm_core_utils_repo: Path, tmp_path: Path) -> Path:
+    """Private copy of the shared pnpm monorepo for a test's registry to write into."""
+    return shutil.copytree(pnpm_core_utils_repo, tmp_path / "repo")
+
+
+class TestPackageRegistryEnhanced:
+    """Test enhanced PackageRegistry functionality for monorepo support."""
+
+    @pytest.mark.parametrize(
+        ("repo", "expected_deps"),
+        [
+            (
+                PNPM_CORE_UTILS_REPO,
+                {
+                    "@repo/core": {"@repo/utils"},
+                    "@repo/ui": {"@repo/core", "@repo/utils"},
                 },
-                'npm-dep': {
-                    'package.json': json.dumps({
-                        "name": "@repo/npm-dep"
-                    }),
-                    'src': {
-                        'index.ts': 'export const npmDep = "npmDep";'
-                    }
-                }
-            }
-        }
-        
-        temp_repo = self.create_temp_repo(structure)
-        
-        try:
-            registry = PackageRegistry(temp_repo)
-            internal_deps = registry.get_internal_package_dependencies()
-            
-            # Check that both workspace: and * protocols are detected
-            assert "@repo/mixed" in internal_deps
-            expected_deps = {"@repo/workspace-dep", "@repo/npm-dep"}
-            assert internal_deps["@repo/mixed"] == expected_deps
-            
-            # nonexistent package should not be included
-            assert "@repo/nonexistent" not in internal_deps["@repo/mixed"]
-            
-        finally:
-            import shutil
-            shutil.rmtree(temp_repo)
-
-    def test_scoped_and_unscoped_packages(self):
+            ),
+            # lodash is "*" too, but it is not an internal package
+            (NPM_STAR_REPO, {"@repo/core": {"@repo/utils"}}),
+            # @repo/nonexistent is "*" but has no package in the repo
+            (
+                MIXED_PROTOCOLS_REPO,
+                {"@repo/mixed": {"@repo/workspace-dep", "@repo/npm-dep"}},
+            ),
+        ],
+        ids=["pnpm-workspace", "npm-star", "mixed"],
+    )
+    def test_internal_package_dependencies(
+        self, repo_builder, repo, expected_deps
+    ):
+        """Test detection of internal dependencies across dependency protocols."""
+        registry = PackageRegistry(str(repo_builder(repo)))
+
+        # External and unknown packages never appear, nor do packages without
+        # internal dependencies
+        assert registry.get_internal_package_dependencies() == expected_deps
+
+    def test_path_mappings_generation(self, copy_of_pnpm_repo):
+        """Test generation of TypeScript path mappings for internal packages."""
+        registry = PackageRegistry(str(copy_of_pnpm_repo))
+        path_mappings = registry.generate_path_mappings_for_internal_packages()
+
+        # Check that path mappings point to package directories
+        assert "@repo/core" in path_mappings
+        assert path_mappings["@repo/core"] == ["packages/core"]
+
+        assert "@repo/core/*" in path_mappings
+        assert path_mappings["@repo/core/*"] == ["packages/core/*"]
+
+        # utils package mapping
+        assert "@repo/utils" in path_mappings
+        assert path_mappings["@repo/utils"] == ["packages/utils"]
+
+        assert "@repo/utils/*" in path_mappings
+        assert path_mappings["@repo/utils/*"] == ["packages/utils/*"]
+
+    def test_consolidate_tsconfig_with_path_mappings(self, copy_of_pnpm_repo):
+        """Test tsconfig consolidation includes path mappings."""
+        temp_repo = copy_of_pnpm_repo
+
+        registry = PackageRegistry(str(temp_repo))
+        result = registry.consolidate_tsconfig_for_monorepo()
+
+        assert result is True
+
+        # Check that tsconfig.json was created
+        tsconfig_path = temp_repo / 'tsconfig.json'
+        assert tsconfig_path.exists()
+
+        # Read and verify the generated config
+        with open(tsconfig_path, 'r') as f:
+            config = json.load(f)
+
+        # Check basic structure
+        assert "compilerOptions" in config
+        assert "baseUrl" in config["compilerOptions"]
+        assert config["compilerOptions"]["baseUrl"] == "."
+
+        # Check that path mappings were included
+        assert "paths" in config["compilerOptions"]
+        paths = config["compilerOptions"]["paths"]
+
+        assert "@repo/core" in paths
+        assert "@repo/utils" in paths
+        assert "@repo/core/*" in paths
+        assert "@repo/utils/*" in paths
+
+        # Check include patterns
+        assert "include" in config
+        assert len(config["include"]) > 0
+
+    def test_consolidate_tsconfig_preserves_existing_config(self, repo_builder):
+        """Test that existing tsconfig is backed up and extended."""
+        temp_repo = repo_builder(EXISTING_TSCONFIG_REPO)
+
+        registry = PackageRegistry(str(temp_repo))
+        result = registry.consolidate_tsconfig_for_monorepo()
+
+        assert result is True
+
+        # Check that backup was created
+        backup_path = temp_repo / 'tsconfig.prev.json'
+        assert backup_path.exists()
+
+        # Check that new config extends the backup
+        tsconfig_path = temp_repo / 'tsconfig.json'
+        with open(tsconfig_path, 'r') as f:
+            config = json.load(f)
+
+        assert "extends" in config
+        assert config["extends"] == "./tsconfig.prev.json"
+
+    def test_single_package_repo_skips_consolidation(self, repo_builder):
+        """Test that single-package repos skip consolidation."""
+        temp_repo = repo_builder(SINGLE_PACKAGE_STRUCTURE)
+
+        registry = PackageRegistry(str(temp_repo))
+        result = registry.consolidate_tsconfig_for_monorepo()
+
+        # Should skip consolidation for single package
+        assert result is False
+
+    def test_scoped_and_unscoped_packages(self, repo_builder):
         """Test handling of both scoped and unscoped package names."""
-        structure = {
-            'package.json': json.dumps({
-                "name": "monorepo",
-                "private": True,
-                "workspaces": ["packages/*"]
-            }),
-            'packages': {
-                'scoped': {
-                    'package.json': json.dumps({
-                        "name": "@org/scoped",
-                        "dependencies": {
-                            "unscoped": "workspace:*",
-                            "@org/another": "workspace:*"
-                        }
-                    }),
-                    'src': {
-                        'index.ts': 'export const scoped = "scoped";'
-                    }
-                },
-                'unscoped': {
-                    'package.json': json.dumps({
-                        "name": "unscoped"
-                    }),
-                    'src': {
-                        'index.ts': 'export const unscoped = "unscoped";'
-                    }
-                },
-                'another': {
-                    'package.json': json.dumps({
-                        "name": "@org/another"
-                    }),
-                    'src': {
-                        'index.ts': 'export const another = "another";'
-                    }
-                }
-            }
-        }
-        
-        temp_repo = self.create_temp_repo(structure)
-        
-        try:
-            registry = PackageRegistry(temp_repo)
-            internal_deps = registry.get_internal_package_dependencies()
-            path_mappings = registry.generate_path_mappings_for_internal_packages()
-            
-            # Check internal dependencies
-            assert "@org/scoped" in internal_deps
-            expected_deps = {"unscoped", "@org/another"}
-            assert internal_deps["@org/scoped"] == expected_deps
-            
-            # Check path mappings for both scoped and unscoped
-            assert "@org/scoped" in path_mappings
-            assert "unscoped" in path_mappings
-            assert "@org/another" in path_mappings
-            
-        finally:
-            import shutil
-            shutil.rmtree(temp_repo)
-
-    def test_packages_with_different_entry_points(self):
+        temp_repo = repo_builder(SCOPED_UNSCOPED_REPO)
+
+        registry = PackageRegistry(str(temp_repo))
+        internal_deps = registry.get_internal_package_dependencies()
+        path_mappings = registry.generate_path_mappings_for_internal_packages()
+
+        # Check internal dependencies
+        assert "@org/scoped" in internal_deps
+        expected_deps = {"unscoped", "@org/another"}
+        assert internal_deps["@org/scoped"] == expected_deps
+
+        # Check path mappings for both scoped and unscoped
+        assert "@org/scoped" in path_mappings
+        assert "unscoped" in path_mappings
+        assert "@org/another" in path_mappings
+
+    def test_package_discovery_runs_once(self, copy_of_pnpm_repo):
+        """Test that lookups reuse the packages discovered at construction."""
+        discover = PackageRegistry._discover_and_register_packages
+        with patch.object(
+            PackageRegistry,
+            "_discover_and_register_packages",
+            autospec=True,
+            side_effect=discover,
+        ) as spy:
+            registry = PackageRegistry(str(copy_of_pnpm_repo))
+            _ = registry.get_all_packages()
+            _ = registry.get_workspace_packages()
+            _ = registry.get_package("@repo/core")
+
+        spy.assert_called_once_with(registry)
+        assert registry.has_package("@repo/utils")
+
+    def test_packages_with_different_entry_points(self, repo_builder):
         """Test path mappings for packages with various configurations."""
-        structure = {
-            'package.json': json.dumps({
-                "name": "monorepo",
-                "private": True,
-                "workspaces": ["packages/*"]
-            }),
-            'packages': {
-                'with-main': {
-                    'package.json': json.dumps({
-                        "name": "@repo/with-main",
-                        "main": "./lib/custom.js"
-                    }),
-                    'lib': {
-                        'custom.ts': 'export const custom = "custom";'
-                    }
-                },
-                'with-exports': {
-                    'package.json': json.dumps({
-                        "name": "@repo/with-exports",
-                        "exports": {
-                            ".": "./dist/index.js"
-                        }
-                    }),
-                    'dist': {
-                        'index.ts': 'export const exports = "exports";'
-                    }
-                },
-                'default-structure': {
-                    'package.json': json.dumps({
-                        "name": "@repo/default"
-                    }),
-                    'src': {
-                        'index.ts': 'export const defaultPkg = "default";'
-                    }
-                }
-            }
+        temp_repo = repo_builder(ENTRY_POINTS_REPO)
+
+        registry = PackageRegistry(str(temp_repo))
+        path_mappings = registry.generate_path_mappings_for_internal_packages()
+
+        # Each package maps to its directory, plus a subpath wildcard,
+        # regardless of how its entry point is declared
+        expected_dirs = {
+            "@repo/with-main": "packages/with-main",
+            "@repo/with-exports": "packages/with-exports",
+            "@repo/default": "packages/default-structure",
         }
-        
-        temp_repo = self.create_temp_repo(structure)
-        
-        try:
-            registry = PackageRegistry(temp_repo)
-            path_mappings = registry.generate_path_mappings_for_internal_packages()
-            
-            # Check that path mappings point to package directories
-            assert "@repo/with-main" in path_mappings
-            main_mapping = path_mappings["@repo/with-main"][0]
-            assert main_mapping == "packages/with-main"
-            
-            assert "@repo/with-exports" in path_mappings  
-            exports_mapping = path_mappings["@repo/with-exports"][0]
-            assert exports_mapping == "packages/with-exports"
-            
-            assert "@repo/default" in path_mappings
-            default_mapping = path_mappings["@repo/default"][0]
-            assert default_mapping == "packages/default-structure"
-            
-            # Check that subpath mappings exist
-            assert "@repo/with-main/*" in path_mappings
-            assert path_mappings["@repo/with-main/*"] == ["packages/with-main/*"]
-            
-        finally:
-            import shutil
-            shutil.rmtree(temp_repo)
-
-    def test_error_handling_malformed_package_json(self):
+        for name, package_dir in expected_dirs.items():
+            assert path_mappings[name] == [package_dir]
+            assert path_mappings[f"{name}/*"] == [f"{package_dir}/*"]
+
+    def test_error_handling_malformed_package_json(self, repo_builder):
         """Test graceful handling of malformed package.json files."""
-        structure = {
-            'package.json': json.dumps({
-                "name": "monorepo",
-                "private": True,
-                "workspaces": ["packages/*"]
-            }),
-            'packages': {
-                'valid': {
-                    'package.json': json.dumps({
-                        "name": "@repo/valid",
-                        "dependencies": {
-                            "@repo/invalid": "workspace:*"
-                        }
-                    }),
-                    'src': {
-                        'index.ts': 'export const valid = "valid";'
-                    }
-                },
-                'invalid': {
-                    'package.json': '{ "name": "@repo/invalid", malformed json',  # Invalid JSON
-                    'src': {
-                        'index.ts': 'export const invalid = "invalid";'
-                    }
-                }
-            }
-        }
-        
-        temp_repo = self.create_temp_repo(structure)
-        
-        try:
-            # This should not crash despite malformed JSON
-            registry = PackageRegistry(temp_repo)
-            internal_deps = registry.get_internal_package_dependencies()
-            
-            # Valid package should still be processed
-            assert "@repo/valid" in internal_deps
-            
-        finally:
-            import shutil
-            shutil.rmtree(temp_repo)
\ No newline at end of file
+        temp_repo = repo_builder(MALFORMED_PACKAGE_JSON_STRUCTURE)
+
+        # This should not crash despite malformed JSON
+        registry = PackageRegistry(str(temp_repo))
+        internal_deps = registry.get_internal_package_dependencies()
+
+        # Valid package should still be processed
+        assert "@repo/valid" in internal_deps
@@ -2,30 +2,25 @@
 
 import pytest
 import asyncio
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock
 
 from ai_analysis.parallel_summaries import (
     ParallelSummaryExecutor,
     generate_summaries_parallel,
 )
 from ai_analysis.summaries import definition_summary_cache, file_summary_cache
-from dag_builder.netx import DAGBuilder
 
 
 class TestParallelSummaryExecutor:
     """Test cases for ParallelSummaryExecutor."""
 
     def test_compute_definition_traversal_order(
-        self, parallel_test_structure, db_manager
+        self, parallel_test_structure, db_manager, definition_graph
     ):
         """Test computation of definition traversal levels for parallel processing."""
         structure = parallel_test_structure
         executor = ParallelSummaryExecutor(db_manager)
 
-        # Build the definition graph using DAGBuilder
-        dag_builder = DAGBuilder(db_manager)
-        definition_graph = dag_builder.build_function_dependency_graph()
-
         # Debug: print graph edges to understand structure
         print("Graph edges:")
         for source, target in definition_graph.edges():
@@ -42,65 +37,44 @@ class TestParallelSummaryExecutor:
         # Compute traversal levels
         levels = executor.compute_batched_traversal_order(definition_graph)
 
+        id_to_name = {
+            definition.id: definition.name
+            for defs in structure["definitions"].values()
+            for definition in defs
+        }
+        level_names = [
+            [id_to_name[def_id] for def_id_set in level for def_id in def_id_set]
+            for level in levels
+        ]
+
         print("Computed levels:")
-        for i, level in enumerate(levels):
-            level_names = []
-            for def_id in level:
-                for defs in structure["definitions"].values():
-                    for definition in defs:
-                        if definition.id == def_id:
-                            level_names.append(definition.name)
-            print(f"  Level {i}: {level_names}")
+        for i, names in enumerate(level_names):
+            print(f"  Level {i}: {names}")
 
         # Now verify the correct dependency order
         assert len(levels) == 3, f"Expected 3 levels, got {len(levels)}"
 
         # Level 0 should have definitions with no dependencies (UtilsA, UtilsB)
-        level_0_names = []
         print("Level 0 definitions:", levels[0])
-        for def_id_set in levels[0]:
-            for def_id in def_id_set:
-                for defs in structure["definitions"].values():
-                    for definition in defs:
-                        if definition.id == def_id:
-                            level_0_names.append(definition.name)
-
-        assert set(level_0_names) == {"UtilsA", "UtilsB"}, f"Level 0: {level_0_names}"
+        assert set(level_names[0]) == {"UtilsA", "UtilsB"}, (
+            f"Level 0: {level_names[0]}"
+        )
 
         # Level 1 should have ServiceA, ServiceB
-        level_1_names = []
-        for def_id_set in levels[1]:
-            for def_id in def_id_set:
-                for defs in structure["definitions"].values():
-                    for definition in defs:
-                        if definition.id == def_id:
-                            level_1_names.append(definition.name)
-
-        assert set(level_1_names) == {"ServiceA", "ServiceB"}, (
-            f"Level 1: {level_1_names}"
+        assert set(level_names[1]) == {"ServiceA", "ServiceB"}, (
+            f"Level 1: {level_names[1]}"
         )
 
         # Level 2 should have MainApp
-        level_2_names = []
-        for def_id_set in levels[2]:
-            for def_id in def_id_set:
-                for defs in structure["definitions"].values():
-                    for definition in defs:
-                        if definition.id == def_id:
-                            level_2_names.append(definition.name)
+        assert set(level_names[2]) == {"MainApp"}, f"Level 2: {level_names[2]}"
 
-        assert set(level_2_names) == {"MainApp"}, f"Level 2: {level_2_names}"
-
-    def test_compute_file_traversal_order(self, parallel_test_structure, db_manager):
+    def test_compute_file_traversal_order(
+        self, parallel_test_structure, db_manager, file_graph
+    ):
         """Test computation of file traversal levels for parallel processing."""
         structure = parallel_test_structure
         executor = ParallelSummaryExecutor(db_manager)
 
-        # Build graphs
-        dag_builder = DAGBuilder(db_manager)
-        definition_graph = dag_builder.build_function_dependency_graph()
-        file_graph = dag_builder.build_file_dependency_graph(definition_graph)
-
         # Compute file traversal levels
         levels = executor.compute_batched_traversal_order(file_graph)
 
@@ -109,15 +83,11 @@ class TestParallelSummaryExecutor:
         assert len(levels) >= 1, f"Expected at least 1 level, got {len(levels)}"
 
         # Map file IDs back to paths for verification
-        file_paths_by_level = []
-        for level in levels:
-            level_paths = []
-            for file_id_set in level:
-                for file_id in file_id_set:
-                    for file in structure["files"]:
-                        if file.id == file_id:
-                            level_paths.append(file.file_path)
-            file_paths_by_level.append(level_paths)
+        id_to_path = {file.id: file.file_path for file in structure["files"]}
+        file_paths_by_level = [
+            [id_to_path[file_id] for file_id_set in level for file_id in file_id_set]
+            for level in levels
+        ]
 
         print(f"File processing levels: {file_paths_by_level}")
 
@@ -129,28 +99,49 @@ class TestParallelSummaryExecutor:
                 break
         assert base_utils_found, "base_utils.ts should be in processing levels"
 
-    @patch("ai_analysis.parallel_summaries.generate_definition_summary_with_llm")
-    @patch("ai_analysis.parallel_summaries.generate_file_summary_with_llm")
     @pytest.mark.asyncio
     async def test_parallel_summary_generation_happy_path(
-        self, mock_file_llm, mock_def_llm, parallel_test_structure, db_manager
+        self,
+        monkeypatch,
+        parallel_test_structure,
+        db_manager,
+        definition_graph,
+        file_graph,
     ):
         """Test the complete parallel summary generation flow."""
         structure = parallel_test_structure
 
-        # Mock LLM responses with different content for each definition/file
+        # Mock LLM responses with different content for each definition/file,
+        # recording the order in which summaries are generated
+        summary_order: list[int] = []
+        file_summary_order: list[int] = []
+
         def mock_def_response(definition):
-            return f"AI summary for {definition.name} ({definition.definition_type})"
+            summary_order.append(definition.id)
+            summary = f"AI summary for {definition.name} ({definition.definition_type})"
+            return summary, summary
 
         def mock_file_response(file):
-            return f"AI summary for file {file.file_path}"
-
-        mock_def_llm.side_effect = mock_def_response
-        mock_file_llm.side_effect = mock_file_response
+            file_summary_order.append(file.id)
+            summary = f"AI summary for file {file.file_path}"
+            return summary, summary
+
+        mock_def_llm = AsyncMock(side_effect=mock_def_response)
+        mock_file_llm = AsyncMock(side_effect=mock_file_response)
+        monkeypatch.setattr(
+            "ai_analysis.parallel_summaries.generate_definition_summary_with_llm",
+            mock_def_llm,
+        )
+        monkeypatch.setattr(
+            "ai_analysis.parallel_summaries.generate_file_summary_with_llm",
+            mock_file_llm,
+        )
 
         # Execute parallel summary generation
         executor = ParallelSummaryExecutor(db_manager, max_concurrent=3)
-        stats = await executor.generate_all_summaries_parallel()
+        stats = await executor.generate_all_summaries_parallel(
+            definition_graph, file_graph
+        )
 
         # Verify statistics
         assert stats["total_definitions"] == 5, (
@@ -203,32 +194,47 @@ class TestParallelSummaryExecutor:
             f"File LLM calls: {mock_file_llm.call_count}"
         )
 
-        # Verify dependency order was respected - dependencies should be processed before dependents
-        # This is implicitly tested by the fact that the mock functions succeeded without dependency errors
+        # Verify dependency order was respected: every dependency (edge target)
+        # was summarized before its dependent (edge source)
+        for graph, order in (
+            (definition_graph, summary_order),
+            (file_graph, file_summary_order),
+        ):
+            for dependent, dependency in graph.edges():
+                assert order.index(dependency) < order.index(dependent), (
+                    f"{dependency} summarized after its dependent {dependent}"
+                )
 
     @pytest.mark.asyncio
-    async def test_convenience_function(self, parallel_test_structure, db_manager):
+    async def test_convenience_function(
+        self,
+        monkeypatch,
+        parallel_test_structure,
+        db_manager,
+        definition_graph,
+        file_graph,
+    ):
         """Test the convenience function for parallel summary generation."""
-        with (
-            patch(
-                "ai_analysis.parallel_summaries.generate_definition_summary_with_llm"
-            ) as mock_def_llm,
-            patch(
-                "ai_analysis.parallel_summaries.generate_file_summary_with_llm"
-            ) as mock_file_llm,
-        ):
-            mock_def_llm.return_value = "Mocked definition summary"
-            mock_file_llm.return_value = "Mocked file summary"
-
-            # Test the convenience function
-            stats = await generate_summaries_parallel(db_manager, max_concurrent=2)
-
-            # Verify it produces reasonable statistics
-            assert "total_definitions" in stats
-            assert "total_files" in stats
-            assert "total_processing_time" in stats
-            assert stats["total_definitions"] > 0
-            assert stats["total_files"] > 0
+        monkeypatch.setattr(
+            "ai_analysis.parallel_summaries.generate_definition_summary_with_llm",
+            AsyncMock(return_value=("Mocked definition summary",) * 2),
+        )
+        monkeypatch.setattr(
+            "ai_analysis.parallel_summaries.generate_file_summary_with_llm",
+            AsyncMock(return_value=("Mocked file summary",) * 2),
+        )
+
+        # Test the convenience function
+        stats = await generate_summaries_parallel(
+            db_manager, definition_graph, file_graph, max_concurrent=2
+        )
+
+        # Verify it produces reasonable statistics
+        assert "total_definitions" in stats
+        assert "total_files" in stats
+        assert "total_processing_time" in stats
+        assert stats["total_definitions"] > 0
+        assert stats["total_files"] > 0
 
 
 if __name__ == "__main__":
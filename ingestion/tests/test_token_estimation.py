@@ -1,11 +1,14 @@
 """Integration test for token estimation with parallel summary generation."""
 
 import asyncio
+import heapq
 import os
 from pathlib import Path
-from unittest.mock import AsyncMock, patch
+from typing import Any
+from unittest.mock import AsyncMock
 
 import pytest
+from sqlalchemy import func
 
 from database.manager import DatabaseManager
 from ai_analysis.parallel_summaries import ParallelSummaryExecutor
@@ -14,8 +17,11 @@ from ai_analysis.summaries import (
     _estimate_summary_tokens,
     _calculate_definition_input_tokens,
     _calculate_file_input_tokens,
+    _definition_input_tokens,
+    _file_input_tokens,
 )
-from database.models import DefinitionModel, FileModel
+from dag_builder.netx import DAGBuilder
+from database.models import DefinitionModel, FileModel, ReferenceModel
 
 
 class TestTokenEstimation:
@@ -30,9 +36,9 @@ class TestTokenEstimation:
             pytest.skip(f"Merchie database not found at {db_path}")
         return str(db_path)
 
-    @pytest.mark.asyncio
-    async def test_token_estimation_integration(self, merchie_db_path):
-        """Test token estimation on the real merchie database with mocked LLM calls."""
+    @pytest.fixture
+    async def token_estimation_run(self, monkeypatch, merchie_db_path):
+        """Run parallel summary generation on the merchie database with mocked LLM calls."""
         print(f"\\n📊 Testing token estimation on: {merchie_db_path}")
 
         # Connect to existing database
@@ -47,6 +53,25 @@ class TestTokenEstimation:
             print(f"   - Total files: {total_files}")
             print(f"   - Total definitions: {total_definitions}")
 
+            # Dependency and definition counts for the mocks, aggregated in SQL
+            # rather than by loading each collection just to take its len()
+            reference_counts: dict[int, int] = dict(
+                session.query(
+                    ReferenceModel.source_definition_id, func.count(ReferenceModel.id)
+                )
+                .group_by(ReferenceModel.source_definition_id)
+                .all()
+            )
+            definition_counts: dict[int, int] = dict(
+                session.query(DefinitionModel.file_id, func.count(DefinitionModel.id))
+                .group_by(DefinitionModel.file_id)
+                .all()
+            )
+
+        # Summary output estimates depend only on the entity type
+        def_output_tokens = _estimate_summary_tokens("definition")
+        file_output_tokens = _estimate_summary_tokens("file")
+
         # Track requests and tokens per level for rate limiting analysis
         level_stats = {
             "definition_levels": [],
@@ -65,10 +90,9 @@ class TestTokenEstimation:
         async def mock_def_summary_with_tokens(definition):
             """Mock definition summary generation with realistic token estimation."""
             input_tokens = _calculate_definition_input_tokens(
-                definition,
-                len(definition.function_calls) + len(definition.type_references),
+                definition, reference_counts.get(definition.id, 0)
             )
-            output_tokens = _estimate_summary_tokens(entity_type="definition")
+            output_tokens = def_output_tokens
 
             # sleep to simulate LLM processing time
             # await asyncio.sleep(1)
@@ -78,12 +102,15 @@ class TestTokenEstimation:
             level_stats["def_level_input_tokens"] += input_tokens
             level_stats["def_level_output_tokens"] += output_tokens
 
-            return f"[MOCK] Summary for {definition.name} (est. {input_tokens} input + {output_tokens} output tokens)"
+            summary = f"[MOCK] Summary for {definition.name} (est. {input_tokens} input + {output_tokens} output tokens)"
+            return summary, summary
 
         async def mock_file_summary_with_tokens(file):
             """Mock file summary generation with realistic token estimation."""
-            input_tokens = _calculate_file_input_tokens(file, len(file.definitions))
-            output_tokens = _estimate_summary_tokens("file")
+            input_tokens = _calculate_file_input_tokens(
+                file, definition_counts.get(file.id, 0)
+            )
+            output_tokens = file_output_tokens
 
             # sleep to simulate LLM processing time
             # await asyncio.sleep(1)
@@ -93,28 +120,33 @@ class TestTokenEstimation:
             level_stats["file_level_input_tokens"] += input_tokens
             level_stats["file_level_output_tokens"] += output_tokens
 
-            return f"[MOCK] Summary for {file.file_path} (est. {input_tokens} input + {output_tokens} output tokens)"
+            summary = f"[MOCK] Summary for {file.file_path} (est. {input_tokens} input + {output_tokens} output tokens)"
+            return summary, summary
+
+        # Build the dependency graphs once; the executor's levels are reused
+        # below for the rate limiting analysis
+        dag_builder = DAGBuilder(db_manager)
+        definition_graph = dag_builder.build_function_dependency_graph()
+        file_graph = dag_builder.build_file_dependency_graph(definition_graph)
 
         # Execute parallel summary generation with mocked LLM calls
-        with (
-            patch(
-                "ai_analysis.parallel_summaries.generate_definition_summary_with_llm",
-                new_callable=AsyncMock,
-            ) as mock_def_llm,
-            patch(
-                "ai_analysis.parallel_summaries.generate_file_summary_with_llm",
-                new_callable=AsyncMock,
-            ) as mock_file_llm,
-        ):
-            mock_def_llm.side_effect = mock_def_summary_with_tokens
-            mock_file_llm.side_effect = mock_file_summary_with_tokens
+        monkeypatch.setattr(
+            "ai_analysis.parallel_summaries.generate_definition_summary_with_llm",
+            AsyncMock(side_effect=mock_def_summary_with_tokens),
+        )
+        monkeypatch.setattr(
+            "ai_analysis.parallel_summaries.generate_file_summary_with_llm",
+            AsyncMock(side_effect=mock_file_summary_with_tokens),
+        )
 
-            executor = ParallelSummaryExecutor(
-                db_manager=db_manager,
-                max_requests_per_second=15000,
-                min_batch_size=1000,
-            )
-            stats = await executor.generate_all_summaries_parallel()
+        executor = ParallelSummaryExecutor(
+            db_manager=db_manager,
+            max_requests_per_second=15000,
+            min_batch_size=1000,
+        )
+        stats = await executor.generate_all_summaries_parallel(
+            definition_graph, file_graph
+        )
 
         print(f"\\n🚀 Parallel processing completed:")
         print(f"   - Definition levels: {stats['definition_levels']}")
@@ -123,317 +155,317 @@ class TestTokenEstimation:
         print(f"   - Total files processed: {stats['total_files']}")
         print(f"   - Processing time: {stats['total_processing_time']:.2f}s")
 
-        # Analyze rate limiting impact by examining level structure
-        print(f"\\n⚡ Rate limiting analysis:")
+        return db_manager, executor, stats
 
-        with db_manager.get_session() as session:
-            from dag_builder.netx import DAGBuilder
+    @pytest.mark.asyncio
+    async def test_token_estimation_smoke(self, token_estimation_run):
+        """Check parallel summary generation covers the merchie database."""
+        _, _, stats = token_estimation_run
 
-            dag_builder = DAGBuilder(db_manager)
-            definition_graph = dag_builder.build_function_dependency_graph()
-            file_graph = dag_builder.build_file_dependency_graph(definition_graph)
+        # Basic validation
+        assert stats["total_definitions"] > 0, "Should have processed definitions"
+        assert stats["total_files"] > 0, "Should have processed files"
+        assert stats["definition_levels"] > 0, (
+            "Should have definition processing levels"
+        )
+        assert stats["file_levels"] > 0, "Should have file processing levels"
 
-            # Get actual level breakdowns
-            definition_levels = executor.compute_batched_traversal_order(
-                definition_graph
+    @pytest.mark.debug
+    @pytest.mark.asyncio
+    async def test_token_estimation_report(self, token_estimation_run):
+        """Print the token usage and rate limiting report for the merchie database."""
+        _print_token_report(*token_estimation_run)
+
+
+def _print_token_report(
+    db_manager: DatabaseManager,
+    executor: ParallelSummaryExecutor,
+    stats: dict[str, Any],
+) -> None:
+    """Print token estimates, rate limiting concerns and costs for a finished run."""
+    def_output_tokens = _estimate_summary_tokens("definition")
+    file_output_tokens = _estimate_summary_tokens("file")
+
+    # Analyze rate limiting impact by examining level structure
+    print(f"\\n⚡ Rate limiting analysis:")
+
+    with db_manager.get_session() as session:
+        # Get actual level breakdowns
+        definition_levels = executor.last_definition_levels
+        file_levels = executor.last_file_levels
+
+        # One pass over every definition and file computes the estimates for
+        # both the level sums and the top consumer breakdowns. Only the
+        # columns the estimates read are fetched, with the dependency and
+        # definition counts aggregated in SQL
+        definition_rows = (
+            session.query(
+                DefinitionModel.id,
+                DefinitionModel.name,
+                DefinitionModel.definition_type,
+                DefinitionModel.source_code,
+                FileModel.file_path,
+                func.count(ReferenceModel.id),
             )
-            file_levels = executor.compute_batched_traversal_order(file_graph)
-
-            # Analyze definition levels for rate limiting
-            max_concurrent_def_requests = 0
-            max_def_tokens_per_level = 0
-
-            total_requests = 0
-
-            print(f"\\n📊 Definition levels breakdown:")
-            for i, level in enumerate(definition_levels):
-                level_requests = sum(len(def_id_set) for def_id_set in level)
-                level_input_tokens = 0
-                level_output_tokens = 0
-
-                for def_id_set in level:
-                    for def_id in def_id_set:
-                        definition = (
-                            session.query(DefinitionModel)
-                            .filter(DefinitionModel.id == def_id)
-                            .first()
-                        )
-                        if definition:
-                            num_deps = len(definition.function_calls) + len(
-                                definition.type_references
-                            )
-                            input_tokens = _calculate_definition_input_tokens(
-                                definition, num_deps
-                            )
-                            output_tokens = _estimate_summary_tokens("definition")
-                            level_input_tokens += input_tokens
-                            level_output_tokens += output_tokens
-
-                level_total_tokens = level_input_tokens + level_output_tokens
-                max_concurrent_def_requests = max(
-                    max_concurrent_def_requests, level_requests
-                )
-                max_def_tokens_per_level = max(
-                    max_def_tokens_per_level, level_total_tokens
-                )
+            .outerjoin(FileModel, DefinitionModel.file_id == FileModel.id)
+            .outerjoin(
+                ReferenceModel,
+                ReferenceModel.source_definition_id == DefinitionModel.id,
+            )
+            .group_by(DefinitionModel.id)
+            .all()
+        )
+        file_rows = (
+            session.query(
+                FileModel.id,
+                FileModel.file_path,
+                FileModel.file_content,
+                func.count(DefinitionModel.id),
+            )
+            .outerjoin(DefinitionModel, DefinitionModel.file_id == FileModel.id)
+            .group_by(FileModel.id)
+            .all()
+        )
 
-                print(
-                    f"   Level {i}: {level_requests} requests, {level_total_tokens:,} tokens"
-                )
+        # Only the estimates are kept per row; the top consumers are
+        # formatted from the fetched rows once they have been selected
+        def_input_tokens: dict[int, int] = {
+            def_id: _definition_input_tokens(source_code, num_deps)
+            for def_id, _, _, source_code, _, num_deps in definition_rows
+        }
+        file_input_tokens: dict[int, int] = {
+            file_id: _file_input_tokens(file_content, num_defs)
+            for file_id, _, file_content, num_defs in file_rows
+        }
 
-                total_requests += level_requests
-
-            # Analyze file levels for rate limiting
-            max_concurrent_file_requests = 0
-            max_file_tokens_per_level = 0
-
-            print(f"\\n📁 File levels breakdown:")
-            for i, level in enumerate(file_levels):
-                level_requests = sum(len(file_id_set) for file_id_set in level)
-                level_input_tokens = 0
-                level_output_tokens = 0
-
-                for file_id_set in level:
-                    for file_id in file_id_set:
-                        file = (
-                            session.query(FileModel)
-                            .filter(FileModel.id == file_id)
-                            .first()
-                        )
-                        if file:
-                            input_tokens = _calculate_file_input_tokens(
-                                file, len(file.definitions)
-                            )
-                            output_tokens = _estimate_summary_tokens("file")
-                            level_input_tokens += input_tokens
-                            level_output_tokens += output_tokens
-
-                level_total_tokens = level_input_tokens + level_output_tokens
-                max_concurrent_file_requests = max(
-                    max_concurrent_file_requests, level_requests
-                )
-                max_file_tokens_per_level = max(
-                    max_file_tokens_per_level, level_total_tokens
-                )
+        # Analyze definition levels for rate limiting
+        max_concurrent_def_requests = 0
+        max_def_tokens_per_level = 0
 
-                print(
-                    f"   Level {i}: {level_requests} requests, {level_total_tokens:,} tokens"
-                )
+        total_requests = 0
 
-                total_requests += level_requests
+        print(f"\\n📊 Definition levels breakdown:")
+        for i, level in enumerate(definition_levels):
+            level_requests = sum(len(def_id_set) for def_id_set in level)
+            level_input_tokens = 0
+            level_output_tokens = 0
 
-            # Rate limiting analysis
-            max_concurrent_requests = max(
-                max_concurrent_def_requests, max_concurrent_file_requests
+            for def_id_set in level:
+                for def_id in def_id_set:
+                    input_tokens = def_input_tokens.get(def_id)
+                    if input_tokens is not None:
+                        level_input_tokens += input_tokens
+                        level_output_tokens += def_output_tokens
+
+            level_total_tokens = level_input_tokens + level_output_tokens
+            max_concurrent_def_requests = max(
+                max_concurrent_def_requests, level_requests
             )
-            max_tokens_per_level = max(
-                max_def_tokens_per_level, max_file_tokens_per_level
+            max_def_tokens_per_level = max(
+                max_def_tokens_per_level, level_total_tokens
             )
 
-            # OpenAI GPT-4 rate limits (conservative estimates)
-            requests_per_minute = 3500
-            tokens_per_minute = 90000
-
-            print(f"\\n🚨 Rate limiting concerns:")
-            print(
-                f"   - Max concurrent requests in any level: {max_concurrent_requests}"
-            )
-            print(f"   - Max tokens in any level: {max_tokens_per_level:,}")
             print(
-                f"   - OpenAI limits: {requests_per_minute} req/min, {tokens_per_minute:,} tokens/min"
+                f"   Level {i}: {level_requests} requests, {level_total_tokens:,} tokens"
             )
 
-            if max_concurrent_requests > requests_per_minute:
-                print(
-                    f"   ⚠️  REQUEST RATE LIMIT RISK: Level needs {max_concurrent_requests} requests (>{requests_per_minute} limit)"
-                )
-                batches_needed = (
-                    max_concurrent_requests + requests_per_minute - 1
-                ) // requests_per_minute
-                print(
-                    f"      └─ Recommend splitting largest level into {batches_needed} batches"
-                )
-            else:
-                print(f"   ✅ Request rate within limits")
+            total_requests += level_requests
 
-            if max_tokens_per_level > tokens_per_minute:
-                print(
-                    f"   ⚠️  TOKEN RATE LIMIT RISK: Level needs {max_tokens_per_level:,} tokens (>{tokens_per_minute:,} limit)"
-                )
-                minutes_needed = max_tokens_per_level / tokens_per_minute
-                print(
-                    f"      └─ Would need {minutes_needed:.1f} minutes for largest level"
-                )
-            else:
-                print(f"   ✅ Token rate within limits")
-
-            # Provide batching recommendations
-            if (
-                max_concurrent_requests > requests_per_minute
-                or max_tokens_per_level > tokens_per_minute
-            ):
-                print(f"\\n💡 Recommended batching strategy:")
-                safe_request_batch_size = requests_per_minute // 2  # Conservative
-                safe_token_batch_size = tokens_per_minute // 2  # Conservative
-
-                # Calculate batch size based on most constraining factor
-                request_based_batch_size = max_concurrent_requests // (
-                    (max_concurrent_requests + requests_per_minute - 1)
-                    // requests_per_minute
-                )
-                token_based_batch_size = max_tokens_per_level // (
-                    (max_tokens_per_level + tokens_per_minute - 1) // tokens_per_minute
-                )
+        # Analyze file levels for rate limiting
+        max_concurrent_file_requests = 0
+        max_file_tokens_per_level = 0
 
-                recommended_batch_size = min(
-                    safe_request_batch_size,
-                    request_based_batch_size,
-                    safe_token_batch_size
-                    // max(max_tokens_per_level // max_concurrent_requests, 1),
-                )
+        print(f"\\n📁 File levels breakdown:")
+        for i, level in enumerate(file_levels):
+            level_requests = sum(len(file_id_set) for file_id_set in level)
+            level_input_tokens = 0
+            level_output_tokens = 0
 
-                print(
-                    f"   - Process {recommended_batch_size} items at a time within each level"
-                )
-                print(f"   - Add 1-2 second delays between batches")
-                print(f"   - Monitor rate limit headers and adjust dynamically")
+            for file_id_set in level:
+                for file_id in file_id_set:
+                    input_tokens = file_input_tokens.get(file_id)
+                    if input_tokens is not None:
+                        level_input_tokens += input_tokens
+                        level_output_tokens += file_output_tokens
 
-        # Calculate detailed token estimates
-        total_def_input_tokens = 0
-        total_def_output_tokens = 0
-        total_file_input_tokens = 0
-        total_file_output_tokens = 0
-
-        # Get sample of definitions and files for detailed analysis
-        with db_manager.get_session() as session:
-            definitions = session.query(DefinitionModel).all()  # Sample for performance
-            files = session.query(FileModel).all()  # Sample for performance
+            level_total_tokens = level_input_tokens + level_output_tokens
+            max_concurrent_file_requests = max(
+                max_concurrent_file_requests, level_requests
+            )
+            max_file_tokens_per_level = max(
+                max_file_tokens_per_level, level_total_tokens
+            )
 
             print(
-                f"\\n📊 Token estimation details (sample of {len(definitions)} definitions, {len(files)} files):"
+                f"   Level {i}: {level_requests} requests, {level_total_tokens:,} tokens"
             )
 
-            # Estimate definition tokens
-            def_token_breakdown = []
-            for definition in definitions:
-                num_deps = len(definition.function_calls) + len(
-                    definition.type_references
-                )
-                input_tokens = _calculate_definition_input_tokens(definition, num_deps)
-                output_tokens = _estimate_summary_tokens("definition")
-
-                total_def_input_tokens += input_tokens
-                total_def_output_tokens += output_tokens
-
-                def_token_breakdown.append(
-                    {
-                        "name": definition.name,
-                        "type": definition.definition_type,
-                        "file": definition.file.file_path.split("/")[-1]
-                        if definition.file
-                        else "unknown",
-                        "input_tokens": input_tokens,
-                        "output_tokens": output_tokens,
-                        "dependencies": num_deps,
-                    }
-                )
+            total_requests += level_requests
 
-            # Estimate file tokens
-            file_token_breakdown = []
-            for file in files:
-                input_tokens = _calculate_file_input_tokens(file, len(file.definitions))
-                output_tokens = _estimate_summary_tokens("file")
-
-                total_file_input_tokens += input_tokens
-                total_file_output_tokens += output_tokens
-
-                file_token_breakdown.append(
-                    {
-                        "path": file.file_path,
-                        "input_tokens": input_tokens,
-                        "output_tokens": output_tokens,
-                        "definitions_count": len(file.definitions),
-                    }
-                )
+        # Rate limiting analysis
+        max_concurrent_requests = max(
+            max_concurrent_def_requests, max_concurrent_file_requests
+        )
+        max_tokens_per_level = max(
+            max_def_tokens_per_level, max_file_tokens_per_level
+        )
+
+        # OpenAI GPT-4 rate limits (conservative estimates)
+        requests_per_minute = 3500
+        tokens_per_minute = 90000
+
+        print(f"\\n🚨 Rate limiting concerns:")
+        print(
+            f"   - Max concurrent requests in any level: {max_concurrent_requests}"
+        )
+        print(f"   - Max tokens in any level: {max_tokens_per_level:,}")
+        print(
+            f"   - OpenAI limits: {requests_per_minute} req/min, {tokens_per_minute:,} tokens/min"
+        )
 
-        # Show top token consumers
-        print(f"\\n🔥 Top 10 definition token consumers:")
-        def_token_breakdown.sort(key=lambda x: x["input_tokens"], reverse=True)
-        for i, def_info in enumerate(def_token_breakdown[:10]):
+        if max_concurrent_requests > requests_per_minute:
             print(
-                f"   {i + 1:2d}. {def_info['type']} '{def_info['name']}' in {def_info['file']}"
+                f"   ⚠️  REQUEST RATE LIMIT RISK: Level needs {max_concurrent_requests} requests (>{requests_per_minute} limit)"
             )
+            batches_needed = (
+                max_concurrent_requests + requests_per_minute - 1
+            ) // requests_per_minute
             print(
-                f"       Input: {def_info['input_tokens']:,} | Output: {def_info['output_tokens']:,} | Deps: {def_info['dependencies']}"
+                f"      └─ Recommend splitting largest level into {batches_needed} batches"
             )
+        else:
+            print(f"   ✅ Request rate within limits")
 
-        print(f"\\n📁 Top 10 file token consumers:")
-        file_token_breakdown.sort(key=lambda x: x["input_tokens"], reverse=True)
-        for i, file_info in enumerate(file_token_breakdown[:10]):
-            print(f"   {i + 1:2d}. {file_info['path']}")
+        if max_tokens_per_level > tokens_per_minute:
             print(
-                f"       Input: {file_info['input_tokens']:,} | Output: {file_info['output_tokens']:,} | Defs: {file_info['definitions_count']}"
+                f"   ⚠️  TOKEN RATE LIMIT RISK: Level needs {max_tokens_per_level:,} tokens (>{tokens_per_minute:,} limit)"
             )
+            minutes_needed = max_tokens_per_level / tokens_per_minute
+            print(
+                f"      └─ Would need {minutes_needed:.1f} minutes for largest level"
+            )
+        else:
+            print(f"   ✅ Token rate within limits")
 
-        # Calculate total estimated costs
-        total_input_tokens = (total_def_input_tokens + total_file_input_tokens) * 4.36363636
-        total_output_tokens = (total_def_output_tokens + total_file_output_tokens) * 4.36363636
-        total_tokens = total_input_tokens + total_output_tokens
-
-
-        print(f"\\n💰 Estimated token costs:")
-        print(f"   - Definition input tokens: {total_def_input_tokens:,}")
-        print(f"   - Definition output tokens: {total_def_output_tokens:,}")
-        print(f"   - File input tokens: {total_file_input_tokens:,}")
-        print(f"   - File output tokens: {total_file_output_tokens:,}")
-        print(f"   - Total input tokens: {total_input_tokens:,}")
-        print(f"   - Total output tokens: {total_output_tokens:,}")
-        print(f"   - TOTAL TOKENS: {total_tokens:,}")
-        print(f"   - TOTAL REQUESTS: {total_requests:,}")
-
-        # Analyze parallelization benefits
-        avg_defs_per_level = (
-            stats["total_definitions"] / stats["definition_levels"]
-            if stats["definition_levels"] > 0
-            else 0
-        )
-        avg_files_per_level = (
-            stats["total_files"] / stats["file_levels"]
-            if stats["file_levels"] > 0
-            else 0
-        )
+        # Provide batching recommendations
+        if (
+            max_concurrent_requests > requests_per_minute
+            or max_tokens_per_level > tokens_per_minute
+        ):
+            print(f"\\n💡 Recommended batching strategy:")
+            safe_request_batch_size = requests_per_minute // 2  # Conservative
+            safe_token_batch_size = tokens_per_minute // 2  # Conservative
+
+            # Calculate batch size based on most constraining factor
+            request_based_batch_size = max_concurrent_requests // (
+                (max_concurrent_requests + requests_per_minute - 1)
+                // requests_per_minute
+            )
+            token_based_batch_size = max_tokens_per_level // (
+                (max_tokens_per_level + tokens_per_minute - 1) // tokens_per_minute
+            )
 
-        print(f"\\n⚡ Parallelization analysis:")
-        print(f"   - Average definitions per level: {avg_defs_per_level:.1f}")
-        print(f"   - Average files per level: {avg_files_per_level:.1f}")
-        print(
-            f"   - Parallelization potential: {max(avg_defs_per_level, avg_files_per_level):.1f}x speedup"
-        )
+            recommended_batch_size = min(
+                safe_request_batch_size,
+                request_based_batch_size,
+                safe_token_batch_size
+                // max(max_tokens_per_level // max_concurrent_requests, 1),
+            )
 
-        # Basic validation
-        assert stats["total_definitions"] > 0, "Should have processed definitions"
-        assert stats["total_files"] > 0, "Should have processed files"
-        assert stats["definition_levels"] > 0, (
-            "Should have definition processing levels"
-        )
-        assert stats["file_levels"] > 0, "Should have file processing levels"
+            print(
+                f"   - Process {recommended_batch_size} items at a time within each level"
+            )
+            print(f"   - Add 1-2 second delays between batches")
+            print(f"   - Monitor rate limit headers and adjust dynamically")
+
+    # Calculate detailed token estimates
+    total_def_input_tokens = sum(def_input_tokens.values())
+    total_def_output_tokens = def_output_tokens * len(definition_rows)
+    total_file_input_tokens = sum(file_input_tokens.values())
+    total_file_output_tokens = file_output_tokens * len(file_rows)
+
+    print(
+        f"\\n📊 Token estimation details (sample of {len(definition_rows)} definitions, {len(file_rows)} files):"
+    )
 
-        print(f"\\n✅ Token estimation integration test completed!")
-        print(f"\\n🎯 Key insights:")
+    # Show top token consumers
+    print(f"\\n🔥 Top 10 definition token consumers:")
+    # Only the top 10 are shown, so select them instead of sorting every row
+    top_defs = heapq.nlargest(
+        10, definition_rows, key=lambda row: def_input_tokens[row[0]]
+    )
+    for i, (def_id, name, definition_type, _, file_path, num_deps) in enumerate(
+        top_defs
+    ):
+        file_name = file_path.rsplit("/", 1)[-1] if file_path else "unknown"
+        print(f"   {i + 1:2d}. {definition_type} '{name}' in {file_name}")
         print(
-            f"   - Parallel processing organized into {stats['definition_levels']} definition + {stats['file_levels']} file levels"
+            f"       Input: {def_input_tokens[def_id]:,} | Output: {def_output_tokens:,} | Deps: {num_deps}"
         )
+
+    print(f"\\n📁 Top 10 file token consumers:")
+    top_files = heapq.nlargest(
+        10, file_rows, key=lambda row: file_input_tokens[row[0]]
+    )
+    for i, (file_id, file_path, _, num_defs) in enumerate(top_files):
+        print(f"   {i + 1:2d}. {file_path}")
         print(
-            f"   - Token usage scaled appropriately with content size and dependencies"
+            f"       Input: {file_input_tokens[file_id]:,} | Output: {file_output_tokens:,} | Defs: {num_defs}"
         )
-        print(f"   - Cost estimation provides realistic budget planning for LLM usage")
+
+    # Calculate total estimated costs
+    total_input_tokens = (total_def_input_tokens + total_file_input_tokens) * 4.36363636
+    total_output_tokens = (total_def_output_tokens + total_file_output_tokens) * 4.36363636
+    total_tokens = total_input_tokens + total_output_tokens
+
+
+    print(f"\\n💰 Estimated token costs:")
+    print(f"   - Definition input tokens: {total_def_input_tokens:,}")
+    print(f"   - Definition output tokens: {total_def_output_tokens:,}")
+    print(f"   - File input tokens: {total_file_input_tokens:,}")
+    print(f"   - File output tokens: {total_file_output_tokens:,}")
+    print(f"   - Total input tokens: {total_input_tokens:,}")
+    print(f"   - Total output tokens: {total_output_tokens:,}")
+    print(f"   - TOTAL TOKENS: {total_tokens:,}")
+    print(f"   - TOTAL REQUESTS: {total_requests:,}")
+
+    # Analyze parallelization benefits
+    avg_defs_per_level = (
+        stats["total_definitions"] / stats["definition_levels"]
+        if stats["definition_levels"] > 0
+        else 0
+    )
+    avg_files_per_level = (
+        stats["total_files"] / stats["file_levels"]
+        if stats["file_levels"] > 0
+        else 0
+    )
+
+    print(f"\\n⚡ Parallelization analysis:")
+    print(f"   - Average definitions per level: {avg_defs_per_level:.1f}")
+    print(f"   - Average files per level: {avg_files_per_level:.1f}")
+    print(
+        f"   - Parallelization potential: {max(avg_defs_per_level, avg_files_per_level):.1f}x speedup"
+    )
+
+    print(f"\\n✅ Token estimation report completed!")
+    print(f"\\n🎯 Key insights:")
+    print(
+        f"   - Parallel processing organized into {stats['definition_levels']} definition + {stats['file_levels']} file levels"
+    )
+    print(
+        f"   - Token usage scaled appropriately with content size and dependencies"
+    )
+    print(f"   - Cost estimation provides realistic budget planning for LLM usage")
 
 
 if __name__ == "__main__":
     # Run the test directly for development
     pytest.main(
         [
-            __file__ + "::TestTokenEstimation::test_token_estimation_integration",
+            __file__ + "::TestTokenEstimation::test_token_estimation_report",
+            "-m",
+            "debug",
             "-v",
             "-s",
         ]